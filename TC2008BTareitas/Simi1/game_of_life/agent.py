@@ -34,41 +34,22 @@ class Cell(FixedAgent):
         self.top_left = 0
         self.top_right = 0
         self.top_center = 0
+        # Los pone el modelo con link_neighbors() una vez creadas todas las celdas
+        self.upper_neighbors = (BORDER, BORDER, BORDER)
+        self.frozen = False
 
     def determine_state(self):
+        # Leemos directo a los tres vecinos de arriba que el modelo resolvio al crearnos
+        left, center, right = self.upper_neighbors
+        self.top_left = left.state
+        self.top_center = center.state
+        self.top_right = right.state
 
-        # Sacamos la lista de vecinos y para cada uno vemos si esta justo arriba de la celula
-
-        for neighbor in self.neighbors:
-            if neighbor.x == self.x - 1 and neighbor.y == self.y + 1:
-                self.top_left = neighbor.is_alive
-            elif neighbor.x == self.x and neighbor.y == self.y + 1:
-                self.top_center = neighbor.is_alive
-            elif neighbor.x == self.x + 1 and neighbor.y == self.y + 1:
-                self.top_right = neighbor.is_alive
-
-        # Determinamos el estado de los vecinos de arriba para ver nuestro estado
-        if (self.top_left, self.top_center, self.top_right) == (1, 1, 1):
-            next_bit = 0
-        elif (self.top_left, self.top_center, self.top_right) == (1, 1, 0):
-            next_bit = 1
-        elif (self.top_left, self.top_center, self.top_right) == (1, 0, 1):
-            next_bit = 0
-        elif (self.top_left, self.top_center, self.top_right)   == (1, 0, 0):
-            next_bit = 1
-        elif (self.top_left, self.top_center, self.top_right) == (0, 1, 1):
-            next_bit = 1
-        elif (self.top_left, self.top_center, self.top_right) == (0, 1, 0):
-            next_bit = 0
-        elif (self.top_left, self.top_center, self.top_right) == (0, 0, 1):
-            next_bit = 1
-        elif (self.top_left, self.top_center, self.top_right) == (0, 0, 0):
-            next_bit = 0
-        else:
-            next_bit = 0
+        # Los tres bits de arriba forman el indice de la tabla de la regla (izquierda = bit mas alto)
+        next_bit = self.model.rule_table[self.top_left << 2 | self.top_center << 1 | self.top_right]
 
         # Evitamos que la fila de hasta arriba de hasta arriba cambie el estado
-        if self.y == self.model.grid.height - 1:
+        if self.frozen:
             self._next_state = self.state
         else:
             self._next_state = self.ALIVE if next_bit == 1 else self.DEAD
@@ -77,4 +58,13 @@ class Cell(FixedAgent):
 
     def assume_state(self):
         """Set the state to the new computed state -- computed in step()."""
-        self.state = self._next_state
\ No newline at end of file
+        self.state = self._next_state
+
+
+class _Border:
+    """Vecino muerto que ocupa el lugar de las celdas fuera del grid."""
+
+    state = 0
+
+
+BORDER = _Border()
@@ -0,0 +1,62 @@
+import numpy as np
+
+
+def pack_grid(cells):
+    """Pack a (width, height) 0/1 array into a single int.
+
+    Cell (x, y) is bit ``y * (width + 1) + x``. The extra bit after every row
+    is always 0, it keeps the left and right neighbors of a row from reading
+    the rows next to it.
+    """
+    width, height = cells.shape
+    rows = np.zeros((height, width + 1), dtype=np.uint8)
+    rows[:, :width] = cells.T
+    return int.from_bytes(np.packbits(rows.ravel(), bitorder="little").tobytes(), "little")
+
+
+def unpack_grid(bits, width, height):
+    """Inverse of ``pack_grid``."""
+    size = (width + 1) * height
+    raw = np.frombuffer(bits.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    rows = np.unpackbits(raw, count=size, bitorder="little").reshape(height, width + 1)
+    return np.ascontiguousarray(rows[:, :width].T)
+
+
+def unpack_rows(rows, width):
+    """Unpack a list of row ints (cell x at bit x) into a (width, len(rows)) array."""
+    size = (width + 7) // 8
+    raw = np.frombuffer(b"".join(row.to_bytes(size, "little") for row in rows), dtype=np.uint8)
+    cells = np.unpackbits(raw, bitorder="little").reshape(len(rows), size * 8)
+    return np.ascontiguousarray(cells[:, :width].T)
+
+
+def minterms(rule):
+    """Minterms of ``rule`` as (negate, indices).
+
+    The rule is the OR of the minterms ``left << 2 | center << 1 | right``
+    in ``indices``, negated when ``negate`` is True. The side with fewer
+    terms is used.
+    """
+    ones = [i for i in range(8) if rule >> i & 1]
+    if len(ones) > 4:
+        return True, [i for i in range(8) if not rule >> i & 1]
+    return False, ones
+
+
+def apply_rule_bits(terms, rows, mask):
+    """Apply a rule, given by ``minterms``, to every cell of packed ``rows``.
+
+    Each cell reads the cells at its own position and at its left and right in
+    ``rows``; bits outside ``mask`` (the gap bits included) come out as 0.
+    """
+    negate, indices = terms
+    # Para cada bit (0 o 1) de cada vecino, la palabra donde ese vecino vale eso
+    left = (~(rows << 1), rows << 1)
+    center = (~rows, rows)
+    right = (~(rows >> 1), rows >> 1)
+    out = 0
+    for i in indices:
+        out |= left[i >> 2 & 1] & center[i >> 1 & 1] & right[i & 1]
+    if negate:
+        out = ~out
+    return out & mask
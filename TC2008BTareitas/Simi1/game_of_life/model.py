@@ -1,15 +1,54 @@
+import numpy as np
 from mesa import Model
 from mesa.discrete_space import OrthogonalMooreGrid
-from .agent import Cell
+from .agent import BORDER, Cell
+from .bit_engine import apply_rule_bits, minterms, pack_grid, unpack_grid, unpack_rows
+from .row_engine import apply_rule, rule_lookup
 
 
 class ConwaysGameOfLife(Model):
     """Represents the 2-dimensional array of cells in Conway's Game of Life."""
 
-    def __init__(self, width=50, height=50, initial_fraction_alive=0.2, seed=None):
-        """Create a new playing area of (width, height) cells."""
+    def __init__(self, width=50, height=50, initial_fraction_alive=0.2, seed=None, rule=90, engine="agents"):
+        """Create a new playing area of (width, height) cells.
+
+        Args:
+            rule: Wolfram number (0-255) of the elementary rule the cells follow.
+            engine: "agents" to model every cell as a Cell, "array" to keep
+                the states in a NumPy grid, "bits" to pack the whole grid
+                into one int, a bit per cell, or "history" to compute only
+                the newest row each step (see ``_init_history``). All engines
+                give the same grids for the same seed.
+        """
         super().__init__(seed=seed)
 
+        if not 0 <= rule <= 255:
+            raise ValueError(f"rule must be between 0 and 255, not {rule}")
+        self.rule = rule
+        # Siguiente estado para cada combinacion de los tres vecinos de arriba:
+        # rule_table[izquierda << 2 | centro << 1 | derecha]
+        self.rule_table = tuple((rule >> i) & 1 for i in range(8))
+
+        if engine not in ("agents", "array", "bits", "history"):
+            raise ValueError(
+                f"Unknown engine {engine!r}, use 'agents', 'array', 'bits' or 'history'"
+            )
+        self.engine = engine
+        if engine == "array":
+            self.rule_lookup = rule_lookup(rule)
+            self._init_array(width, height, initial_fraction_alive)
+        elif engine == "bits":
+            self.rule_terms = minterms(rule)
+            self._init_bits(width, height, initial_fraction_alive)
+        elif engine == "history":
+            self.rule_terms = minterms(rule)
+            self._init_history(width, height, initial_fraction_alive)
+        else:
+            self._init_agents(width, height, initial_fraction_alive)
+
+        self.running = True
+
+    def _init_agents(self, width, height, initial_fraction_alive):
         """Grid where cells are connected to their 8 neighbors.
 
         Example for two dimensions:
@@ -34,13 +73,142 @@ class ConwaysGameOfLife(Model):
                 ),
             )
 
-        self.running = True
+        # Resolvemos una sola vez los vecinos de arriba de cada celda
+        self.link_neighbors()
+
+    def _draw_cells(self, width, height, initial_fraction_alive):
+        # Mismo sorteo que con agentes: un random() por celda, en el orden de all_cells
+        draws = [self.random.random() for _ in range(width * height)]
+        alive = (np.array(draws) < initial_fraction_alive).reshape(width, height)
+        # Estados indexados [x, y]; solo la fila de hasta arriba empieza con celulas vivas
+        cells = np.zeros((width, height), dtype=np.uint8)
+        cells[:, -1] = alive[:, -1]
+        return cells
+
+    def _init_array(self, width, height, initial_fraction_alive):
+        self.cells = self._draw_cells(width, height, initial_fraction_alive)
+        # Segundo buffer donde se escribe la siguiente generacion
+        self._next_cells = np.empty_like(self.cells)
+
+    def _init_bits(self, width, height, initial_fraction_alive):
+        self._shape = (width, height)
+        self._row_stride = width + 1
+        self.bits = pack_grid(self._draw_cells(width, height, initial_fraction_alive))
+        # Mascaras de la fila de hasta arriba y de todas las demas
+        top_row = np.zeros((width, height), dtype=np.uint8)
+        top_row[:, -1] = 1
+        self._top_row_mask = pack_grid(top_row)
+        self._lower_rows_mask = pack_grid(1 - top_row)
+
+    def _init_history(self, width, height, initial_fraction_alive):
+        """Set up the engine that only computes the newest row.
+
+        Only the top row starts alive and it never changes, so after t steps
+        row y holds generation ``height - 1 - y`` of the 1D automaton started
+        from the top row, for y >= height - 1 - t, and every row below that
+        holds the all-dead row after t generations (the background). A step
+        is then one new generation plus one background row, O(width) however
+        tall the grid is.
+
+        The generations are kept as row ints in a ring of ``height`` slots.
+        The other engines stop changing after ``height - 1`` steps; this one
+        keeps going and scrolls instead: the top row shows the oldest
+        generation kept and the bottom row the newest.
+        """
+        self._shape = (width, height)
+        self._row_mask = (1 << width) - 1
+        # Mismo sorteo que los otros motores, pero de cada columna solo sirve el random()
+        # de la fila de hasta arriba. Los height - 1 anteriores se gastan de un jalon:
+        # getrandbits(64) consume lo mismo que un random()
+        top_row = np.zeros((width, 1), dtype=np.uint8)
+        for x in range(width):
+            self.random.getrandbits(64 * (height - 1))
+            top_row[x, 0] = self.random.random() < initial_fraction_alive
+        # La generacion g vive en _history[g % height]
+        self._history = [0] * height
+        self._history[0] = pack_grid(top_row)
+        self.generation = 0
+        self._background = 0
+
+    def link_neighbors(self):
+        """Store on every cell the three cells of the row above it.
+
+        The row above is y + 1 and the top row is left as it is. Columns do
+        not wrap: past the left or right edge the neighbor is the dead BORDER.
+        """
+        by_coordinate = {agent.pos: agent for agent in self.agents}
+        height = self.grid.height
+        for agent in self.agents:
+            x, y = agent.pos
+            agent.upper_neighbors = tuple(
+                by_coordinate.get((x + dx, y + 1), BORDER) for dx in (-1, 0, 1)
+            )
+            agent.frozen = y == height - 1
 
     def step(self):
         """Perform the model step in two stages:
 
         - First, all cells assume their next state (whether they will be dead or alive)
         - Then, all cells change state to their next state.
+
+        The array engine does both stages at once, writing the next
+        generation into a second buffer and then swapping the two. The bits
+        engine computes the next generation with a few shifts and boolean
+        operations on the packed grid, and the history engine only computes
+        the newest row.
         """
-        self.agents.do("determine_state")
-        self.agents.do("assume_state")
\ No newline at end of file
+        if self.engine == "array":
+            self._step_array()
+        elif self.engine == "bits":
+            self._step_bits()
+        elif self.engine == "history":
+            self._step_history()
+        else:
+            self.agents.do("determine_state")
+            self.agents.do("assume_state")
+
+    def _step_array(self):
+        cells, next_cells = self.cells, self._next_cells
+        # Cada fila se calcula con la de arriba; la de hasta arriba no cambia
+        apply_rule(self.rule_lookup, cells[:, 1:], next_cells[:, :-1])
+        next_cells[:, -1] = cells[:, -1]
+        self.cells, self._next_cells = next_cells, cells
+
+    def _step_bits(self):
+        bits = self.bits
+        # Recorremos todo una fila hacia abajo para que cada fila lea la de arriba
+        lower_rows = apply_rule_bits(self.rule_terms, bits >> self._row_stride, self._lower_rows_mask)
+        self.bits = lower_rows | bits & self._top_row_mask
+
+    def _step_history(self):
+        height = self._shape[1]
+        newest = self._history[self.generation % height]
+        self.generation += 1
+        self._history[self.generation % height] = apply_rule_bits(
+            self.rule_terms, newest, self._row_mask
+        )
+        # El fondo solo se ve mientras la primera fila no llega hasta abajo
+        if self.generation < height - 1:
+            self._background = apply_rule_bits(self.rule_terms, self._background, self._row_mask)
+
+    def state_grid(self):
+        """Copy of the cell states as a (width, height) uint8 array."""
+        if self.engine == "array":
+            return self.cells.copy()
+        if self.engine == "bits":
+            return unpack_grid(self.bits, *self._shape)
+        if self.engine == "history":
+            width, height = self._shape
+            oldest = max(0, self.generation - (height - 1))
+            rows = []
+            for y in range(height):
+                generation = oldest + height - 1 - y
+                if generation <= self.generation:
+                    rows.append(self._history[generation % height])
+                else:
+                    rows.append(self._background)
+            return unpack_rows(rows, width)
+        states = np.zeros((self.grid.width, self.grid.height), dtype=np.uint8)
+        for agent in self.agents:
+            states[agent.pos] = agent.state
+        return states
@@ -0,0 +1,255 @@
+"""Headless survey of the elementary rules on the Simi1 automaton.
+
+Run from the Simi1 directory, for example:
+
+    python -m game_of_life.survey --replicates 10 --out survey
+
+Every (rule, initial_fraction_alive, replicate) job runs in a process pool,
+on the bits engine by default, until the grid stops changing. Finished jobs
+are written to the ``--out`` directory as Parquet part files (needs
+pyarrow), and running the same command again skips the jobs already there.
+The run settings are kept in ``survey.json`` next to the parts, and a rerun
+with other settings is refused instead of mixing its rows with those.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .model import ConwaysGameOfLife
+
+COLUMNS = [
+    "rule", "fraction", "replicate", "seed", "density", "entropy",
+    "transient", "period", "steps", "wall_time",
+]
+# Archivo en --out con la configuracion de la corrida, revisado al reanudar
+MANIFEST = "survey.json"
+
+
+def _parquet():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("The survey writes Parquet files and needs pyarrow installed") from e
+    return pa, pq
+
+
+def job_seed(base_seed, rule, fraction, replicate):
+    """Seed of one job, fixed by its parameters and not by when it runs."""
+    entropy = [base_seed, rule, int(round(fraction * 1_000_000)), replicate]
+    return int(np.random.SeedSequence(entropy).generate_state(1)[0])
+
+
+def neighborhood_entropy(grid):
+    """Shannon entropy, in bits, of the (left, center, right) patterns along the rows."""
+    # Las columnas fuera del grid cuentan como muertas, igual que en el modelo
+    padded = np.zeros((grid.shape[0] + 2, grid.shape[1]), dtype=np.uint8)
+    padded[1:-1] = grid
+    index = padded[:-2] << 2 | padded[1:-1] << 1 | padded[2:]
+    counts = np.bincount(index.ravel(), minlength=8)
+    p = counts[counts > 0] / index.size
+    return float(-(p * np.log2(p)).sum())
+
+
+def run_job(width, height, rule, fraction, replicate, seed, max_steps, engine="bits"):
+    """Run one model until its grid stops changing and return its result row.
+
+    The grid is fixed after at most height - 1 steps, so the period is
+    always 1 and the transient is the number of steps it took.
+    """
+    start = time.perf_counter()
+    model = ConwaysGameOfLife(width, height, fraction, seed=seed, rule=rule, engine=engine)
+    grid = model.state_grid()
+    steps = 0
+    fixed = False
+    while not fixed and steps < max_steps:
+        model.step()
+        steps += 1
+        next_grid = model.state_grid()
+        fixed = np.array_equal(next_grid, grid)
+        grid = next_grid
+    return {
+        "rule": rule,
+        "fraction": fraction,
+        "replicate": replicate,
+        "seed": seed,
+        "density": float(grid.mean()),
+        "entropy": neighborhood_entropy(grid),
+        "transient": steps - 1 if fixed else None,
+        "period": 1 if fixed else None,
+        "steps": steps,
+        "wall_time": time.perf_counter() - start,
+    }
+
+
+def read_results(out):
+    """All the rows stored so far in the survey directory ``out``."""
+    parts = sorted(Path(out).glob("part-*.parquet"))
+    if not parts:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+
+
+def _check_manifest(out, settings):
+    """Store the run settings in ``out``, or check them against the stored ones."""
+    path = Path(out) / MANIFEST
+    if path.exists():
+        stored = json.loads(path.read_text())
+        if stored != settings:
+            raise ValueError(
+                f"{out} holds a survey run with {stored}, not {settings}; use another output directory"
+            )
+    elif any(Path(out).glob("part-*.parquet")):
+        raise ValueError(
+            f"{out} has results but no {MANIFEST}, so their settings are unknown; "
+            "use another output directory"
+        )
+    else:
+        path.write_text(json.dumps(settings, indent=2))
+
+
+def _write_part(out, rows, index):
+    pa, pq = _parquet()
+    schema = pa.schema(
+        [(name, pa.float64() if name in ("fraction", "density", "entropy", "wall_time") else pa.int64())
+         for name in COLUMNS]
+    )
+    path = Path(out) / f"part-{index:05d}.parquet"
+    # Se escribe aparte y se renombra, para que una corrida cortada no deje un archivo a medias
+    tmp = path.with_name("." + path.name)
+    pq.write_table(pa.Table.from_pylist(rows, schema=schema), tmp)
+    os.replace(tmp, path)
+
+
+def run_survey(
+    rules,
+    fractions,
+    replicates,
+    width=50,
+    height=50,
+    max_steps=1000,
+    base_seed=0,
+    engine="bits",
+    processes=None,
+    out=None,
+    batch_size=256,
+):
+    """Run every (rule, fraction, replicate) job and return one row per run.
+
+    Args:
+        rules: Wolfram numbers to survey.
+        fractions: Values of ``initial_fraction_alive``.
+        replicates: Number of seeds per (rule, fraction).
+        width, height: The size of every grid
+        max_steps: Most steps a single run is given.
+        base_seed: Seed the per-job seeds are derived from.
+        engine: ConwaysGameOfLife engine used by the runs.
+        processes: Worker processes, all cores by default.
+        out: Optional directory. Finished jobs are written there as Parquet
+            part files of ``batch_size`` rows, and jobs already in it are not
+            run again.
+
+    Returns:
+        DataFrame with the columns in ``COLUMNS``, sorted by rule, fraction
+        and replicate.
+
+    Raises:
+        ValueError: If ``out`` already holds results run with another width,
+            height, max_steps, base_seed or engine, or results without a
+            manifest to tell.
+    """
+    if out is not None:
+        _parquet()
+        os.makedirs(out, exist_ok=True)
+        _check_manifest(out, {
+            "width": width,
+            "height": height,
+            "max_steps": max_steps,
+            "base_seed": base_seed,
+            "engine": engine,
+        })
+    rules = [int(r) for r in rules]
+    fractions = [round(float(f), 6) for f in fractions]
+    done = read_results(out) if out is not None else pd.DataFrame(columns=COLUMNS)
+    finished = set(zip(done["rule"], done["fraction"].round(6), done["replicate"]))
+    jobs = [
+        (rule, fraction, replicate)
+        for rule in rules
+        for fraction in fractions
+        for replicate in range(replicates)
+        if (rule, fraction, replicate) not in finished
+    ]
+
+    rows = []
+    pending = []
+    part = len(list(Path(out).glob("part-*.parquet"))) if out is not None else 0
+    try:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [
+                pool.submit(
+                    run_job, width, height, rule, fraction, replicate,
+                    job_seed(base_seed, rule, fraction, replicate), max_steps, engine,
+                )
+                for rule, fraction, replicate in jobs
+            ]
+            for future in as_completed(futures):
+                row = future.result()
+                rows.append(row)
+                pending.append(row)
+                if out is not None and len(pending) >= batch_size:
+                    _write_part(out, pending, part)
+                    part += 1
+                    pending = []
+    finally:
+        if out is not None and pending:
+            _write_part(out, pending, part)
+
+    results = pd.concat([done, pd.DataFrame(rows, columns=COLUMNS)], ignore_index=True)
+    results = results[results["rule"].isin(rules) & results["fraction"].round(6).isin(fractions)]
+    return results.sort_values(["rule", "fraction", "replicate"]).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Elementary rule survey")
+    parser.add_argument("--rules", type=int, nargs="*", default=list(range(256)))
+    parser.add_argument("--width", type=int, default=50)
+    parser.add_argument("--height", type=int, default=50)
+    parser.add_argument("--min-fraction", type=float, default=0.1)
+    parser.add_argument("--max-fraction", type=float, default=0.9)
+    parser.add_argument("--fraction-step", type=float, default=0.1)
+    parser.add_argument("--replicates", type=int, default=10)
+    parser.add_argument("--max-steps", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", choices=["bits", "array", "agents"], default="bits")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--out", default="survey")
+    args = parser.parse_args()
+
+    count = int(round((args.max_fraction - args.min_fraction) / args.fraction_step)) + 1
+    fractions = args.min_fraction + args.fraction_step * np.arange(count)
+    results = run_survey(
+        args.rules,
+        fractions,
+        args.replicates,
+        width=args.width,
+        height=args.height,
+        max_steps=args.max_steps,
+        base_seed=args.seed,
+        engine=args.engine,
+        processes=args.processes,
+        out=args.out,
+        batch_size=args.batch_size,
+    )
+    summary = results.groupby("rule")[["density", "entropy", "period"]].mean()
+    print(summary.to_string())
+
+
+if __name__ == "__main__":
+    main()
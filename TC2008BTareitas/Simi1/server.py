@@ -1,24 +1,52 @@
+import io
+
+import numpy as np
+import PIL.Image
+import solara
+
 from game_of_life.model import ConwaysGameOfLife
 from mesa.visualization import (
     SolaraViz,
-    make_space_component,
 )
 
-from mesa.visualization.components import AgentPortrayalStyle
+from mesa.visualization.utils import update_counter
+
+class RasterFrame:
+    """Black and white image of the grid, one pixel per cell, kept between frames.
+
+    Only the rows that have a cell whose state changed since the last frame
+    are repainted, and the frame is sent as a PNG with one bit per pixel.
+    """
+
+    def __init__(self):
+        self.model = None
+        self.states = None
+        self.pixels = None
 
-def agent_portrayal(agent):
-    return AgentPortrayalStyle(
-        color="white" if agent.state == 0 else "black",
-        marker="s",
-        size=30,
-    )
+    def update(self, model):
+        states = model.state_grid()
+        if model is not self.model or states.shape != self.states.shape:
+            self.model = model
+            # Image rows go from the top of the grid down, with x to the right.
+            # White (True) pixels are dead cells, black ones alive cells.
+            self.pixels = states.T[::-1] == 0
+        else:
+            rows = np.flatnonzero((states != self.states).any(axis=0))
+            self.pixels[states.shape[1] - 1 - rows] = states[:, rows].T == 0
+        self.states = states
+        png = io.BytesIO()
+        PIL.Image.fromarray(self.pixels).save(png, format="png")
+        return png.getvalue()
 
-def post_process(ax):
-    ax.set_aspect("equal")
-    ax.set_xticks([])
-    ax.set_yticks([])
+@solara.component
+def RasterSpace(model):
+    update_counter.get()
+    frame = solara.use_memo(RasterFrame, [])
+    solara.Style(".life-raster img, img.life-raster { image-rendering: pixelated; }")
+    solara.Image(frame.update(model), format="png", width="100%", classes=["life-raster"])
 
 model_params = {
+    "engine": "array",
     "seed": {
         "type": "InputText",
         "value": 42,
@@ -29,7 +57,7 @@ model_params = {
         "value": 50,
         "label": "Width",
         "min": 5,
-        "max": 60,
+        "max": 1000,
         "step": 1,
     },
     "height": {
@@ -37,7 +65,15 @@ model_params = {
         "value": 50,
         "label": "Height",
         "min": 5,
-        "max": 60,
+        "max": 1000,
+        "step": 1,
+    },
+    "rule": {
+        "type": "SliderInt",
+        "value": 90,
+        "label": "Rule",
+        "min": 0,
+        "max": 255,
         "step": 1,
     },
     "initial_fraction_alive": {
@@ -51,13 +87,9 @@ model_params = {
 }
 
 # Create initial model instance
-gof_model = ConwaysGameOfLife()
+gof_model = ConwaysGameOfLife(engine="array")
 
-space_component = make_space_component(
-        agent_portrayal,
-        draw_grid = False,
-        post_process=post_process
-)
+space_component = RasterSpace
 
 page = SolaraViz(
     gof_model,
@@ -34,47 +34,18 @@ class Cell(FixedAgent):
         self.top_left = 0
         self.top_right = 0
         self.top_center = 0
+        # Los pone el modelo con link_neighbors() una vez creadas todas las celdas
+        self.upper_neighbors = (BORDER, BORDER, BORDER)
 
     def determine_state(self):
-        # Reiniciamos los valores de los vecinos
-        self.top_left = 0
-        self.top_center = 0
-        self.top_right = 0
+        # Leemos directo a los tres vecinos de la fila objetivo que el modelo resolvio al crearnos
+        left, center, right = self.upper_neighbors
+        self.top_left = left.state
+        self.top_center = center.state
+        self.top_right = right.state
 
-        # Si estamos en la primera fila (y=0), miramos la última fila (efecto toroidal)
-        if self.y == 0:
-            target_y = self.model.grid.height - 1
-        else:
-            target_y = self.y - 1
-
-        # Sacamos la lista de vecinos y buscamos los que están en la fila objetivo (arriba o última fila)
-        for neighbor in self.neighbors:
-            if neighbor.x == self.x - 1 and neighbor.y == target_y:
-                self.top_left = neighbor.is_alive
-            elif neighbor.x == self.x and neighbor.y == target_y:
-                self.top_center = neighbor.is_alive
-            elif neighbor.x == self.x + 1 and neighbor.y == target_y:
-                self.top_right = neighbor.is_alive
-
-        # Determinamos el estado de los vecinos de arriba para ver nuestro estado
-        if (self.top_left, self.top_center, self.top_right) == (1, 1, 1):
-            next_bit = 0
-        elif (self.top_left, self.top_center, self.top_right) == (1, 1, 0):
-            next_bit = 1
-        elif (self.top_left, self.top_center, self.top_right) == (1, 0, 1):
-            next_bit = 0
-        elif (self.top_left, self.top_center, self.top_right)   == (1, 0, 0):
-            next_bit = 1
-        elif (self.top_left, self.top_center, self.top_right) == (0, 1, 1):
-            next_bit = 1
-        elif (self.top_left, self.top_center, self.top_right) == (0, 1, 0):
-            next_bit = 0
-        elif (self.top_left, self.top_center, self.top_right) == (0, 0, 1):
-            next_bit = 1
-        elif (self.top_left, self.top_center, self.top_right) == (0, 0, 0):
-            next_bit = 0
-        else:
-            next_bit = 0
+        # Los tres bits de arriba forman el indice de la tabla de la regla (izquierda = bit mas alto)
+        next_bit = self.model.rule_table[self.top_left << 2 | self.top_center << 1 | self.top_right]
 
         # Todas las celdas cambian de estado según las reglas
         self._next_state = self.ALIVE if next_bit == 1 else self.DEAD
@@ -83,4 +54,13 @@ class Cell(FixedAgent):
 
     def assume_state(self):
         """Set the state to the new computed state -- computed in step()."""
-        self.state = self._next_state
\ No newline at end of file
+        self.state = self._next_state
+
+
+class _Border:
+    """Vecino muerto que ocupa el lugar de las celdas fuera del grid."""
+
+    state = 0
+
+
+BORDER = _Border()
@@ -0,0 +1,193 @@
+import sys
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+# Estados de una celda de la fila; WALL son las celdas fuera del grid, que nunca cambian
+DEAD = 0
+ALIVE = 1
+WALL = 2
+
+
+class _Node:
+    """Block of 2**level cells, shared by every block with the same contents."""
+
+    __slots__ = ("level", "left", "right", "state", "__weakref__")
+
+    def __init__(self, level, left=None, right=None, state=None):
+        self.level = level
+        self.left = left
+        self.right = right
+        self.state = state
+
+
+class HashLife:
+    """Memoized evolution of one row of an elementary automaton.
+
+    A row is a binary tree of blocks of 2**level cells, and every distinct
+    block is stored once. For a block of level k the engine remembers its
+    center half after 2**j generations (j <= k - 2), so a repeated block is
+    never evolved twice and a jump of 2**j generations costs a number of
+    lookups that grows with j instead of 2**j. The cells past both ends of
+    the row are walls: they never change and count as dead, like the cells
+    outside the grid in ``Cell.determine_state``.
+
+    It pays off once the row falls into short cycles, as most rules do. Rows
+    that keep changing without repeating (rule 90 or 150 on most widths) get
+    little reuse and are faster to step with the array or bits engines.
+
+    Args:
+        rule: Wolfram number (0-255) of the rule.
+        max_cache: Most (block, j) results kept; the least recently used ones
+            are dropped past that.
+    """
+
+    def __init__(self, rule, max_cache=250_000):
+        self.rule_table = tuple((rule >> i) & 1 for i in range(8))
+        self.max_cache = max_cache
+        self.hits = 0
+        self.misses = 0
+        # Bloques vivos por sus dos mitades; se borran solos cuando nadie los usa
+        self._nodes = weakref.WeakValueDictionary()
+        self._results = OrderedDict()
+        self._leaves = [_Node(0, state=state) for state in (DEAD, ALIVE, WALL)]
+        self._walls = [self._leaves[WALL]]
+
+    def advance(self, row, n):
+        """Return ``row`` (a sequence of 0/1) after ``n`` generations."""
+        width = len(row)
+        level = max(1, (width - 1).bit_length())
+        node = self._build(row, level)
+        j = 0
+        while n:
+            if n & 1:
+                node = self._advance_pow2(node, j)
+            n >>= 1
+            j += 1
+        return self._cells(node)[:width]
+
+    def stats(self):
+        """Cache counters and an estimate of the memory held, in bytes."""
+        lookups = self.hits + self.misses
+        sample = self._walls[-1]
+        node_size = sys.getsizeof(sample) + sys.getsizeof(weakref.ref(sample)) + sys.getsizeof((0, 0))
+        memory = (
+            sys.getsizeof(self._nodes.data)
+            + len(self._nodes) * node_size
+            + sys.getsizeof(self._results)
+            + len(self._results) * sys.getsizeof((0, 0))
+        )
+        return {
+            "nodes": len(self._nodes),
+            "cached_results": len(self._results),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_bytes": memory,
+        }
+
+    def _join(self, left, right):
+        key = (left, right)
+        node = self._nodes.get(key)
+        if node is None:
+            node = _Node(left.level + 1, left, right)
+            self._nodes[key] = node
+        return node
+
+    def _wall(self, level):
+        while len(self._walls) <= level:
+            self._walls.append(self._join(self._walls[-1], self._walls[-1]))
+        return self._walls[level]
+
+    def _build(self, row, level):
+        # Hojas de la fila, completando con paredes hasta 2**level celdas
+        nodes = [self._leaves[ALIVE if cell else DEAD] for cell in row]
+        nodes += [self._leaves[WALL]] * ((1 << level) - len(nodes))
+        while len(nodes) > 1:
+            nodes = [self._join(nodes[i], nodes[i + 1]) for i in range(0, len(nodes), 2)]
+        return nodes[0]
+
+    def _cells(self, node):
+        cells = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.level == 0:
+                cells.append(1 if node.state == ALIVE else 0)
+            else:
+                stack.append(node.right)
+                stack.append(node.left)
+        return np.array(cells, dtype=np.uint8)
+
+    def _advance_pow2(self, node, j):
+        """Advance a row block (row from offset 0, walls after it) by 2**j generations."""
+        level = node.level
+        # Raiz de paredes con el bloque justo al inicio de su mitad central
+        top = max(j + 2, level + 2)
+        inner = node
+        while inner.level < top - 2:
+            inner = self._join(inner, self._wall(inner.level))
+        root = self._join(
+            self._join(self._wall(top - 2), inner), self._wall(top - 1)
+        )
+        # El resultado es la mitad central, que empieza donde empieza la fila
+        result = self._result(root, j)
+        while result.level > level:
+            result = result.left
+        return result
+
+    def _next_state(self, left, center, right):
+        if center == WALL:
+            return WALL
+        index = (left == ALIVE) << 2 | (center == ALIVE) << 1 | (right == ALIVE)
+        return ALIVE if self.rule_table[index] else DEAD
+
+    def _result(self, node, j):
+        """Center half of ``node`` after 2**j generations, j <= node.level - 2."""
+        level = node.level
+        if node is self._wall(level):
+            return self._wall(level - 1)
+        key = (node, j)
+        result = self._results.get(key)
+        if result is not None:
+            self.hits += 1
+            self._results.move_to_end(key)
+            return result
+        self.misses += 1
+
+        if level == 2:
+            a, b = node.left.left.state, node.left.right.state
+            c, d = node.right.left.state, node.right.right.state
+            result = self._join(
+                self._leaves[self._next_state(a, b, c)], self._leaves[self._next_state(b, c, d)]
+            )
+        elif j == level - 2:
+            # Dos medios pasos: tres bloques encimados avanzan 2**(j-1), y luego dos
+            left, middle, right = (
+                node.left,
+                self._join(node.left.right, node.right.left),
+                node.right,
+            )
+            r0, r1, r2 = (self._result(part, j - 1) for part in (left, middle, right))
+            result = self._join(
+                self._result(self._join(r0, r1), j - 1),
+                self._result(self._join(r1, r2), j - 1),
+            )
+        else:
+            # Menos de medio paso: cada mitad del centro sale de un bloque de un nivel menos
+            blocks = [
+                half
+                for quarter in (node.left.left, node.left.right, node.right.left, node.right.right)
+                for half in (quarter.left, quarter.right)
+            ]
+            middle = self._join(blocks[3], blocks[4])
+            result = self._join(
+                self._result(self._join(self._join(blocks[1], blocks[2]), middle), j),
+                self._result(self._join(middle, self._join(blocks[5], blocks[6])), j),
+            )
+
+        self._results[key] = result
+        if len(self._results) > self.max_cache:
+            self._results.popitem(last=False)
+        return result
@@ -1,15 +1,82 @@
+import numpy as np
 from mesa import Model
 from mesa.discrete_space import OrthogonalMooreGrid
-from .agent import Cell
+from .agent import BORDER, Cell
+from .bit_engine import apply_rule_bits, minterms, pack_grid, unpack_grid
+from .hashlife import HashLife
+from .row_engine import apply_rule, rule_lookup
 
 
 class ConwaysGameOfLife(Model):
     """Represents the 2-dimensional array of cells in Conway's Game of Life."""
 
-    def __init__(self, width=50, height=50, initial_fraction_alive=0.2, seed=None):
-        """Create a new playing area of (width, height) cells."""
+    def __init__(
+        self,
+        width=50,
+        height=50,
+        initial_fraction_alive=0.2,
+        seed=None,
+        rule=90,
+        engine="agents",
+        track_cycles=False,
+    ):
+        """Create a new playing area of (width, height) cells.
+
+        Args:
+            rule: Wolfram number (0-255) of the elementary rule the cells follow.
+            engine: "agents" to model every cell as a Cell, "array" to keep
+                the states in a NumPy grid, "bits" to pack the whole grid
+                into one int, a bit per cell, or "hashlife" to evolve each row
+                with the memoized ``HashLife`` (for long ``advance`` jumps).
+                All engines give the same grids for the same seed.
+            track_cycles: Remember every generation to find out when the
+                grid repeats. Once it does, ``transient`` and ``period`` are
+                set and ``advance`` skips straight to the generation asked for.
+                Not available with the hashlife engine, whose ``advance`` jumps
+                over the generations it would have to remember.
+        """
         super().__init__(seed=seed)
 
+        if not 0 <= rule <= 255:
+            raise ValueError(f"rule must be between 0 and 255, not {rule}")
+        self.rule = rule
+        # Siguiente estado para cada combinacion de los tres vecinos de arriba:
+        # rule_table[izquierda << 2 | centro << 1 | derecha]
+        self.rule_table = tuple((rule >> i) & 1 for i in range(8))
+
+        if engine not in ("agents", "array", "bits", "hashlife"):
+            raise ValueError(
+                f"Unknown engine {engine!r}, use 'agents', 'array', 'bits' or 'hashlife'"
+            )
+        if track_cycles and engine == "hashlife":
+            raise ValueError("track_cycles is not available with the 'hashlife' engine")
+        self.engine = engine
+        if engine == "array":
+            self.rule_lookup = rule_lookup(rule)
+            self._init_array(width, height, initial_fraction_alive)
+        elif engine == "bits":
+            self.rule_terms = minterms(rule)
+            self._init_bits(width, height, initial_fraction_alive)
+        elif engine == "hashlife":
+            self.hashlife = HashLife(rule)
+            self.cells = self._draw_cells(width, height, initial_fraction_alive)
+        else:
+            self._init_agents(width, height, initial_fraction_alive)
+
+        self.generation = 0
+        # Generacion en la que empieza el ciclo y cuantas generaciones dura, cuando ya se conoce
+        self.transient = None
+        self.period = None
+        self.track_cycles = track_cycles
+        # Llave de cada generacion vista y en que generacion salio por primera vez
+        self._generation_keys = []
+        self._first_seen = {}
+        if track_cycles:
+            self._record_generation()
+
+        self.running = True
+
+    def _init_agents(self, width, height, initial_fraction_alive):
         """Grid where cells are connected to their 8 neighbors.
 
         Example for two dimensions:
@@ -35,13 +102,156 @@ class ConwaysGameOfLife(Model):
                 ),
             )
 
-        self.running = True
+        # Resolvemos una sola vez los vecinos de arriba de cada celda
+        self.link_neighbors()
+
+    def _draw_cells(self, width, height, initial_fraction_alive):
+        # Mismo sorteo que con agentes: un random() por celda, en el orden de all_cells
+        draws = [self.random.random() for _ in range(width * height)]
+        # Estados indexados [x, y]
+        return (np.array(draws) < initial_fraction_alive).reshape(width, height).astype(np.uint8)
+
+    def _init_array(self, width, height, initial_fraction_alive):
+        self.cells = self._draw_cells(width, height, initial_fraction_alive)
+        # Segundo buffer donde se escribe la siguiente generacion
+        self._next_cells = np.empty_like(self.cells)
+
+    def _init_bits(self, width, height, initial_fraction_alive):
+        self._shape = (width, height)
+        self._row_stride = width + 1
+        self.bits = pack_grid(self._draw_cells(width, height, initial_fraction_alive))
+        # Mascara de todas las celdas, sin los bits de separacion entre filas
+        self._cells_mask = pack_grid(np.ones((width, height), dtype=np.uint8))
+
+    def link_neighbors(self):
+        """Store on every cell the three cells of the row it reads from.
+
+        That row is y - 1, wrapping from the first row to the last one.
+        Columns do not wrap: past the left or right edge the neighbor is the
+        dead BORDER.
+        """
+        by_coordinate = {agent.pos: agent for agent in self.agents}
+        height = self.grid.height
+        for agent in self.agents:
+            x, y = agent.pos
+            agent.upper_neighbors = tuple(
+                by_coordinate.get((x + dx, (y - 1) % height), BORDER) for dx in (-1, 0, 1)
+            )
 
     def step(self):
         """Perform the model step in two stages:
 
         - First, all cells assume their next state (whether they will be dead or alive)
         - Then, all cells change state to their next state.
+
+        The array engine does both stages at once, writing the next
+        generation into a second buffer and then swapping the two. The bits
+        engine computes the next generation with a few shifts and boolean
+        operations on the packed grid.
+        """
+        if self.engine == "array":
+            self._step_array()
+        elif self.engine == "bits":
+            self._step_bits()
+        elif self.engine == "hashlife":
+            self._advance_hashlife(1)
+        else:
+            self.agents.do("determine_state")
+            self.agents.do("assume_state")
+
+        self.generation += 1
+        if self.track_cycles and self.period is None:
+            self._record_generation()
+
+    def advance(self, n):
+        """Advance the model by n steps.
+
+        Steps one at a time until a cycle is known, then loads the grid of the
+        target generation directly, so a known cycle costs O(1) steps however
+        large n is. The hashlife engine always jumps the n steps at once.
+        Either way ``steps`` moves with ``generation``, as if step() had been
+        called n times.
         """
-        self.agents.do("determine_state")
-        self.agents.do("assume_state")
\ No newline at end of file
+        if self.engine == "hashlife":
+            self._advance_hashlife(n)
+            self.generation += n
+            self.steps += n
+            return
+        target = self.generation + n
+        while self.generation < target:
+            if self.period is not None:
+                if target >= self.transient:
+                    index = self.transient + (target - self.transient) % self.period
+                else:
+                    index = target
+                self._load_key(self._generation_keys[index])
+                self.steps += target - self.generation
+                self.generation = target
+                return
+            self.step()
+
+    def _advance_hashlife(self, n):
+        height = self.cells.shape[1]
+        # Cada fila es un automata de una dimension: avanza n generaciones
+        # y baja n filas, dando la vuelta al llegar al final (efecto toroidal)
+        rows = [self.hashlife.advance(self.cells[:, y], n) for y in range(height)]
+        self.cells = np.roll(np.stack(rows, axis=1), n % height, axis=1)
+
+    def _record_generation(self):
+        key = self._state_key()
+        first = self._first_seen.setdefault(key, self.generation)
+        if first == self.generation:
+            self._generation_keys.append(key)
+        else:
+            # La configuracion ya habia salido, de aqui en adelante todo se repite
+            self.transient = first
+            self.period = self.generation - first
+            self._first_seen = {}
+
+    def _state_key(self):
+        """Hashable copy of the grid, packed a bit per cell."""
+        if self.engine == "bits":
+            return self.bits
+        cells = self.cells if self.engine in ("array", "hashlife") else self.state_grid()
+        return np.packbits(cells).tobytes()
+
+    def _load_key(self, key):
+        """Set the grid from a ``_state_key`` value."""
+        if self.engine == "bits":
+            self.bits = key
+            return
+        if self.engine in ("array", "hashlife"):
+            shape = self.cells.shape
+        else:
+            shape = (self.grid.width, self.grid.height)
+        packed = np.frombuffer(key, dtype=np.uint8)
+        cells = np.unpackbits(packed, count=shape[0] * shape[1]).reshape(shape)
+        if self.engine in ("array", "hashlife"):
+            self.cells[...] = cells
+        else:
+            for agent in self.agents:
+                agent.state = int(cells[agent.pos])
+
+    def _step_array(self):
+        cells, next_cells = self.cells, self._next_cells
+        # Cada fila se calcula con la anterior, y la primera con la ultima (efecto toroidal)
+        apply_rule(self.rule_lookup, cells[:, :-1], next_cells[:, 1:])
+        apply_rule(self.rule_lookup, cells[:, -1:], next_cells[:, :1])
+        self.cells, self._next_cells = next_cells, cells
+
+    def _step_bits(self):
+        bits, stride = self.bits, self._row_stride
+        # Recorremos todo una fila hacia arriba, y la ultima pasa a ser la primera (efecto toroidal)
+        source = (bits << stride | bits >> stride * (self._shape[1] - 1)) & self._cells_mask
+        self.bits = apply_rule_bits(self.rule_terms, source, self._cells_mask)
+
+    def state_grid(self):
+        """Copy of the cell states as a (width, height) uint8 array."""
+        if self.engine in ("array", "hashlife"):
+            return self.cells.copy()
+        if self.engine == "bits":
+            return unpack_grid(self.bits, *self._shape)
+        states = np.zeros((self.grid.width, self.grid.height), dtype=np.uint8)
+        for agent in self.agents:
+            states[agent.pos] = agent.state
+        return states
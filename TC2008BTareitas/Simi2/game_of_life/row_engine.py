@@ -0,0 +1,20 @@
+import numpy as np
+
+
+def rule_lookup(rule):
+    """Tabla de la regla como arreglo: rule_lookup(rule)[izquierda << 2 | centro << 1 | derecha]."""
+    return np.array([(rule >> i) & 1 for i in range(8)], dtype=np.uint8)
+
+
+def apply_rule(lookup, above, out):
+    """Write into ``out`` the rows that follow the rows in ``above``.
+
+    Both are (width, n) uint8 arrays indexed [x, row]; column j of ``out``
+    is the rule applied to column j of ``above``. Columns do not wrap, the
+    cells past the left and right edges count as dead.
+    """
+    # Indice de tres bits de cada celda, armado con el renglon recorrido a cada lado
+    index = above << 1
+    index[1:] |= above[:-1] << 2
+    index[:-1] |= above[1:]
+    np.take(lookup, index, out=out)
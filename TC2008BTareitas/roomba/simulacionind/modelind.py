@@ -54,6 +54,21 @@ class RandomModel(Model):
 
         self.grid = OrthogonalMooreGrid([width, height], torus=False)
 
+        # Indice denso coordenada -> celda, compartido por todos los agentes:
+        # la celda (x, y) esta en la posicion x * height + y
+        self.cell_index = [None] * (width * height)
+        for cell in self.grid.all_cells:
+            x, y = cell.coordinate
+            self.cell_index[x * height + y] = cell
+
+        # Buffers que reutilizan RandomAgent.bfs y RandomAgent.astar en cada busqueda,
+        # con el mismo indice. Una celda cuenta como visitada solo si su sello es el
+        # de la busqueda actual, asi no hay que limpiarlos entre busquedas.
+        self.search_stamp = [0] * (width * height)
+        self.search_parent = [0] * (width * height)
+        self.search_cost = [0] * (width * height)
+        self.search_generation = 0
+
         # Identify the coordinates of the border of the grid
         border = [(x,y)
                   for y in range(height)
@@ -88,11 +103,7 @@ class RandomModel(Model):
 
         # CREAR EL AGENTE ÚNICO EN LA POSICIÓN [1,1]
         # Buscar la celda en la posición [1,1]
-        start_cell = None
-        for cell in self.grid.all_cells:
-            if cell.coordinate == (1, 1):
-                start_cell = cell
-                break
+        start_cell = self.cell_at(1, 1)
 
         if start_cell is None:
             raise ValueError("No se pudo encontrar la celda (1,1) en el grid")
@@ -128,6 +139,12 @@ class RandomModel(Model):
 
         self.running = True
 
+    def cell_at(self, x, y):
+        """Regresa la celda en (x, y) en O(1), o None si queda fuera del grid."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.cell_index[x * self.height + y]
+        return None
+
     def step(self):
         '''Advance the model by one step.'''
         self.datacollector.collect(self)
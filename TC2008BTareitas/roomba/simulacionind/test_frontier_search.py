@@ -0,0 +1,39 @@
+from agentind import ObstacleAgent, RandomAgent
+from modelind import RandomModel
+
+
+def make_robot():
+    # (2,2) encerrada por sus 4 lados en el mapa del robot; la unica frontera es (8,3)
+    model = RandomModel(porObs=0, probTrash=0, width=12, height=12, seed=0)
+    robot = next(a for a in model.agents if isinstance(a, RandomAgent))
+    robot.mapa = {(x, y): 2 for x in range(12) for y in range(12)}
+    for wall in [(2, 1), (2, 3), (1, 2), (3, 2)]:
+        ObstacleAgent(model, cell=model.cell_at(*wall))
+        robot.mapa[wall] = 1
+    robot.mapa[(8, 3)] = -1
+    robot.cell = model.cell_at(2, 2)
+    return model, robot
+
+
+def test_failed_search_is_not_repeated_in_the_same_region():
+    model, robot = make_robot()
+    robot.proactive_exploration()
+    assert robot.failed_frontier_search == model.search_generation
+
+    searches = model.search_generation
+    robot.cell = model.cell_at(2, 2)
+    robot.proactive_exploration()
+    assert model.search_generation == searches
+
+
+def test_diagonal_move_into_another_region_searches_again():
+    model, robot = make_robot()
+    robot.proactive_exploration()
+    assert robot.failed_frontier_search is not None
+
+    # Un paso en diagonal (vecindad de Moore) sale de la region cerrada
+    robot.cell = model.cell_at(3, 3)
+    robot.proactive_exploration()
+    assert robot.failed_frontier_search is None
+    assert robot.path_to_target[-1] == (8, 3)
+    assert len(robot.path_to_target) == 4
@@ -0,0 +1,31 @@
+import pytest
+
+from agentind import ChargingStationAgent, ObstacleAgent, RandomAgent
+from modelind import RandomModel
+
+
+@pytest.mark.parametrize("obstacle_first", [True, False])
+def test_station_sharing_a_cell_with_an_obstacle_stays_a_source(obstacle_first):
+    # modelind reparte obstaculos con random.choices, asi que uno puede caer en (1,1)
+    # junto a la estacion; el robot tiene que poder volver a cargar igual
+    model = RandomModel(porObs=0, probTrash=0, width=8, height=8, seed=0)
+    robot = next(a for a in model.agents if isinstance(a, RandomAgent))
+    station_cell = model.cell_at(1, 1)
+    if obstacle_first:
+        next(a for a in station_cell.agents if isinstance(a, ChargingStationAgent)).remove()
+        ObstacleAgent(model, cell=station_cell)
+        ChargingStationAgent(model, cell=station_cell)
+    else:
+        ObstacleAgent(model, cell=station_cell)
+
+    robot.cell = model.cell_at(2, 2)
+    robot.scan_environment()
+    height = model.height
+    assert robot.station_distance[1 * height + 1] == 0
+    assert robot.station_distance[2 * height + 2] == 2
+
+    robot.energy = 30
+    robot.go_to_station()
+    robot.go_to_station()
+    assert robot.cell.coordinate == (1, 1)
+    assert robot.state_charging
@@ -0,0 +1,52 @@
+from agentind import ChargingStationAgent, ObstacleAgent, RandomAgent
+from modelind import RandomModel
+
+
+def make_robot():
+    # Robot en (5,5) con su estacion en (1,1) y otra mas cercana en (6,6)
+    model = RandomModel(porObs=0, probTrash=0, width=10, height=10, seed=0)
+    robot = next(a for a in model.agents if isinstance(a, RandomAgent))
+    ChargingStationAgent(model, cell=model.cell_at(6, 6))
+    robot.known_stations.add((6, 6))
+    robot.open_station_distance((6, 6), source=True)
+    robot.cell = model.cell_at(5, 5)
+    robot.energy = 30
+    return model, robot
+
+
+def test_route_to_a_given_station_is_planned_once():
+    model, robot = make_robot()
+    searches = model.search_generation
+    for _ in range(8):
+        robot.go_to_station(station=(1, 1))
+    assert robot.cell.coordinate == (1, 1)
+    assert robot.state_charging
+    assert model.search_generation == searches + 1
+
+
+def test_route_is_replanned_when_an_obstacle_cuts_it():
+    model, robot = make_robot()
+    searches = model.search_generation
+    robot.go_to_station(station=(1, 1))
+    blocked = robot.path_to_station[-1]
+    ObstacleAgent(model, cell=model.cell_at(*blocked))
+    robot.scan_environment()
+    assert robot.path_to_station is None
+
+    for _ in range(20):
+        if robot.state_charging:
+            break
+        robot.go_to_station(station=(1, 1))
+    assert robot.cell.coordinate == (1, 1)
+    assert blocked not in robot.station_route_cells
+    assert model.search_generation == searches + 2
+
+
+def test_without_a_station_the_nearest_one_is_used():
+    model, robot = make_robot()
+    searches = model.search_generation
+    robot.go_to_station()
+    robot.go_to_station()
+    assert robot.cell.coordinate == (6, 6)
+    assert robot.state_charging
+    assert model.search_generation == searches
@@ -1,31 +1,64 @@
 from mesa.discrete_space import FixedAgent
 
+from .array_engine import BURNED_OUT, CONDITION_LABELS, FINE, ON_FIRE
+
 class TreeCell(FixedAgent):
     """A tree cell.
 
     Attributes:
-        condition: Can be "Fine", "On Fire", or "Burned Out"
+        state: Condition code, FINE, ON_FIRE or BURNED_OUT. It lives in the
+            model's condition grid, not on the agent.
+        index: Flat index of the tree's cell, x * height + y
 
     """
     @property
     def neighbors(self):
         return self.cell.neighborhood.agents
 
-    def __init__(self, model, cell):
+    @property
+    def state(self):
+        return self.model.cell_states[self.index]
+
+    @state.setter
+    def state(self, value):
+        # Keep the model-level tally in sync with every condition change.
+        states = self.model.cell_states
+        counts = self.model.condition_counts
+        counts[states[self.index]] -= 1
+        counts[value] += 1
+        states[self.index] = value
+
+    @property
+    def condition(self):
+        """Label of the tree's condition: "Fine", "On Fire" or "Burned Out"."""
+        return CONDITION_LABELS[self.state]
+
+    def __init__(self, model, cell, state=FINE):
         """Create a new tree.
 
         Args:
             model: standard model reference for agent.
+            state: Initial condition code of the tree, or None to keep the
+                code already in the model's condition grid.
         """
         super().__init__(model)
-        self.condition = "Fine"
         self.cell = cell
         self.pos = cell.coordinate
+        self.index = self.pos[0] * model.grid.height + self.pos[1]
+        if state is not None:
+            self.state = state
 
     def step(self):
-        """If the tree is on fire, spread it to fine trees nearby."""
-        if self.condition == "On Fire":
+        """If the tree is on fire, spread it to fine trees nearby.
+
+        Returns:
+            The neighbors that caught fire from this tree.
+        """
+        lit = []
+        if self.state == ON_FIRE:
             for neighbor in self.neighbors:
-                if neighbor.condition == "Fine":
-                    neighbor.condition = "On Fire"
-            self.condition = "Burned Out"
+                if neighbor.state == FINE:
+                    neighbor.state = ON_FIRE
+                    lit.append(neighbor)
+            self.state = BURNED_OUT
+        return lit
@@ -0,0 +1,58 @@
+"""Construction-time benchmark for ForestFire.
+
+Run from the forestFire directory, for example:
+
+    python -m forest_fire.benchmark --sizes 500 1000 2000 --engines array agents
+
+Prints, for every engine and square grid size, the best wall time over the
+repeats of building a model, and how much of it went into planting the
+trees (``_place_trees``).
+"""
+import argparse
+import time
+
+from .model import ForestFire
+
+
+def time_construction(size, engine, density=0.65, seed=0, repeats=3):
+    """Best (total, planting) construction times in seconds over ``repeats``."""
+    best_total = best_planting = float("inf")
+    place_trees = ForestFire._place_trees
+    for _ in range(repeats):
+        planting = 0.0
+
+        def timed_place_trees(model, planted):
+            nonlocal planting
+            start = time.perf_counter()
+            place_trees(model, planted)
+            planting += time.perf_counter() - start
+
+        ForestFire._place_trees = timed_place_trees
+        try:
+            start = time.perf_counter()
+            ForestFire(size, size, density, seed=seed, engine=engine)
+            total = time.perf_counter() - start
+        finally:
+            ForestFire._place_trees = place_trees
+        best_total = min(best_total, total)
+        best_planting = min(best_planting, planting)
+    return best_total, best_planting
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ForestFire construction benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000])
+    parser.add_argument("--engines", nargs="+", choices=["array", "agents"], default=["array", "agents"])
+    parser.add_argument("--density", type=float, default=0.65)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    for engine in args.engines:
+        for size in args.sizes:
+            total, planting = time_construction(size, engine, args.density, args.seed, args.repeats)
+            print(f"{engine:6} {size:5}x{size:<5} total {total:8.3f} s  planting {planting:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
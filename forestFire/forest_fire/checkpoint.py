@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+
+
+def pack_codes(conditions):
+    """Pack a grid of 2-bit cell codes four cells to a byte."""
+    flat = conditions.astype(np.uint8).ravel()
+    flat = np.concatenate([flat, np.zeros(-len(flat) % 4, dtype=np.uint8)])
+    return flat[0::4] | flat[1::4] << 2 | flat[2::4] << 4 | flat[3::4] << 6
+
+
+def unpack_codes(packed, width, height):
+    """Inverse of ``pack_codes``."""
+    flat = np.stack([packed >> shift & 3 for shift in (0, 2, 4, 6)], axis=1).ravel()
+    return flat[: width * height].astype(np.int8).reshape(width, height)
+
+
+def write_snapshot(path, model):
+    """Write the state of a ForestFire model to ``path`` (a .npz file).
+
+    Stores the condition grid packed to 2 bits per cell, the state of both
+    random generators, the step counter, the run settings and the
+    DataCollector rows so far.
+    """
+    version, mt_state, gauss_next = model.random.getstate()
+    collect_every = {"change": -1, "final": -2}.get(model.collect_every, model.collect_every)
+    width, height = model.conditions.shape
+    history = model.datacollector.model_vars
+    np.savez_compressed(
+        path,
+        settings=np.array(
+            [width, height, model.steps, model.running,
+             model.engine == "array", collect_every, version],
+            dtype=np.int64,
+        ),
+        cells=pack_codes(model.conditions),
+        mt_state=np.array(mt_state, dtype=np.uint32),
+        gauss_next=np.array([np.nan if gauss_next is None else gauss_next]),
+        rng_state=np.frombuffer(json.dumps(model.rng.bit_generator.state).encode(), dtype=np.uint8),
+        history=np.array([history[name] for name in history], dtype=np.int64).T.reshape(-1, len(history)),
+        last_record=np.array(model._last_record or [], dtype=np.int64),
+    )
+
+
+def read_snapshot(path):
+    """Read a file written by ``write_snapshot`` back into plain values."""
+    with np.load(path) as data:
+        width, height, steps, running, is_array, collect_every, version = data["settings"].tolist()
+        gauss_next = float(data["gauss_next"][0])
+        return {
+            "width": width,
+            "height": height,
+            "steps": steps,
+            "running": bool(running),
+            "engine": "array" if is_array else "agents",
+            "collect_every": {-1: "change", -2: "final"}.get(collect_every, collect_every),
+            "conditions": unpack_codes(data["cells"], width, height),
+            "random_state": (
+                version,
+                tuple(data["mt_state"].tolist()),
+                None if np.isnan(gauss_next) else gauss_next,
+            ),
+            "rng_state": json.loads(data["rng_state"].tobytes().decode()),
+            "history": data["history"].tolist(),
+            "last_record": tuple(data["last_record"].tolist()) or None,
+        }
@@ -1,52 +1,249 @@
+import heapq
+import random
+
 import mesa
+import numpy as np
 from mesa.discrete_space import OrthogonalMooreGrid
 
 from .agent import TreeCell
+from .array_engine import (
+    BURNED_OUT,
+    CONDITION_CODES,
+    EMPTY,
+    FINE,
+    ON_FIRE,
+    plant_trees,
+    spread_fire,
+)
+from .checkpoint import read_snapshot, write_snapshot
+from .percolation import predict_burn
+from .recording import RowStream
+from .schedule import order_key
 
 class ForestFire(mesa.Model):
     """Simple Forest Fire model."""
 
-    def __init__(self, width=100, height=100, density=0.65, seed=None):
+    def __init__(
+        self,
+        width=100,
+        height=100,
+        density=0.65,
+        seed=None,
+        engine="agents",
+        collect_every=1,
+        stream_to=None,
+    ):
         """Create a new forest fire model.
 
         Args:
             width, height: The size of the grid to model
             density: What fraction of grid cells have a tree in them.
+            engine: "agents" to model every tree as a TreeCell, or "array" to
+                keep the tree conditions in a NumPy grid. Both engines give the
+                same time series for the same seed.
+            collect_every: How often to record the counts. An int k records
+                the initial state, every k-th step and the final step;
+                "change" records a step only when the counts differ from the
+                last record; "final" records only the final step.
+            stream_to: Optional .csv or .parquet path. Records are appended
+                there, with a leading "Step" column, instead of being kept in
+                the DataCollector.
+
+        Each tick the trees step in a fresh random order (see ``order_key``),
+        and only the burning trees are actually stepped.
         """
         super().__init__(seed=seed)
 
-        self.grid = OrthogonalMooreGrid((width, height), capacity=1, random=self.random)
+        if engine not in ("agents", "array"):
+            raise ValueError(f"Unknown engine {engine!r}, use 'agents' or 'array'")
+        self.engine = engine
+        if collect_every not in ("change", "final") and not (
+            isinstance(collect_every, int) and collect_every > 0
+        ):
+            raise ValueError(
+                f"collect_every must be a positive int, 'change' or 'final', not {collect_every!r}"
+            )
+        self.collect_every = collect_every
+        self._last_record = None
+
+        # Number of cells holding each condition code (EMPTY included),
+        # updated as conditions change.
+        self.condition_counts = [width * height, 0, 0, 0]
         self.datacollector = mesa.DataCollector(
             {
-                "Fine": lambda m: self.count_type(m, "Fine"),
-                "On Fire": lambda m: self.count_type(m, "On Fire"),
-                "Burned Out": lambda m: self.count_type(m, "Burned Out"),
+                "Fine": lambda m: m.condition_counts[FINE],
+                "On Fire": lambda m: m.condition_counts[ON_FIRE],
+                "Burned Out": lambda m: m.condition_counts[BURNED_OUT],
             }
         )
 
-        # Place a tree in each cell with Prob = density
-        for cell in self.grid.all_cells:
-            if self.random.random() < density:
-                # Create a tree
-                new_tree = TreeCell(self, cell)
-                # Set all trees in the first column on fire.
-                if cell.coordinate[0] == 0:
-                    new_tree.condition = "On Fire"
+        if engine == "array":
+            self.conditions = np.full((width, height), EMPTY, dtype=np.int8)
+        else:
+            self._init_agents(width, height)
+        self._place_trees(plant_trees(self.rng, width, height, density))
+
+        self.stream = None
+        if stream_to is not None:
+            self.stream = RowStream(stream_to, ["Step", *self.datacollector.model_reporters])
 
         self.running = True
-        self.datacollector.collect(self)
+        self._collect()
+
+    def _init_agents(self, width, height):
+        self.grid = OrthogonalMooreGrid((width, height), capacity=1, random=self.random)
+        # Cell codes of the trees, read and written by TreeCell.state through
+        # a flat memoryview that indexes to plain ints.
+        self.conditions = np.full((width, height), EMPTY, dtype=np.int8)
+        self.cell_states = memoryview(self.conditions.reshape(-1))
+        # Trees currently on fire, the only ones with work to do in a step.
+        self.burning = set()
+
+    def _place_trees(self, planted):
+        """Put the trees of a condition grid on the empty forest.
+
+        The conditions and their counts are written for the whole grid at
+        once. The agents engine then creates the TreeCells in one batch, only
+        for the cells that hold a tree, ordered by flat index like
+        ``planted.ravel()``.
+        """
+        self.conditions[...] = planted
+        self.condition_counts = np.bincount(self.conditions.ravel(), minlength=4).tolist()
+        if self.engine == "array":
+            return
+        planted = self.conditions.ravel()
+        cells = self.grid.all_cells.cells
+        tree_cells = [cells[i] for i in np.flatnonzero(planted).tolist()]
+        trees = TreeCell.create_agents(self, len(tree_cells), tree_cells, state=None)
+        self.burning = set(trees.select(lambda tree: planted[tree.index] == ON_FIRE))
 
     def step(self):
         """Advance the model by one step."""
-        self.agents.shuffle_do("step")
-        # collect data
-        self.datacollector.collect(self)
+        salt = self.random.getrandbits(64)
+        if self.engine == "array":
+            burned_out, ignited = map(int, spread_fire(self.conditions, salt))
+            counts = self.condition_counts
+            counts[FINE] -= ignited + burned_out - counts[ON_FIRE]
+            counts[ON_FIRE] = ignited
+            counts[BURNED_OUT] += burned_out
+        else:
+            self._step_burning(salt)
 
         # Halt if no more fire
-        if self.count_type(self, "On Fire") == 0:
+        if self.condition_counts[ON_FIRE] == 0:
             self.running = False
 
+        # collect data
+        self._collect()
+
+    def _collect(self):
+        """Record the counts when the collection cadence asks for it.
+
+        A streamed run closes its file once the fire is out and records
+        nothing after that.
+        """
+        if self.stream is not None and self.stream.closed:
+            return
+        record = (
+            self.condition_counts[FINE],
+            self.condition_counts[ON_FIRE],
+            self.condition_counts[BURNED_OUT],
+        )
+        if self.collect_every == "final":
+            due = not self.running
+        elif self.collect_every == "change":
+            due = record != self._last_record
+        else:
+            due = not self.running or self.steps % self.collect_every == 0
+        if due:
+            self._last_record = record
+            if self.stream is not None:
+                self.stream.write((self.steps, *record))
+            else:
+                self.datacollector.collect(self)
+        if self.stream is not None and not self.running:
+            self.stream.close()
+
+    def _step_burning(self, salt):
+        """Step the burning trees in key order.
+
+        A tree lit during the tick burns in that same tick when its key comes
+        after the key of the tree that lit it, as it would in a full shuffled
+        pass over the forest; otherwise it waits for the next tick.
+        """
+        queue = [(order_key(salt, tree.index), tree.index, tree) for tree in self.burning]
+        heapq.heapify(queue)
+        burning_next = set()
+        while queue:
+            key, _, tree = heapq.heappop(queue)
+            for neighbor in tree.step():
+                neighbor_key = order_key(salt, neighbor.index)
+                if neighbor_key > key:
+                    heapq.heappush(queue, (neighbor_key, neighbor.index, neighbor))
+                else:
+                    burning_next.add(neighbor)
+        self.burning = burning_next
+
+    def condition_grid(self):
+        """The tree conditions as an int8 (width, height) grid of cell codes."""
+        return self.conditions.copy()
+
+    def predict_final_state(self, steps=True):
+        """Predict how the fire ends without stepping the model.
+
+        Labels the tree clusters to find which ones the fire reaches and, if
+        ``steps`` is True, replays the step order of the coming ticks to get
+        the burn-out time. The model itself is left untouched.
+
+        Returns:
+            dict with the final "Fine", "On Fire" and "Burned Out" counts,
+            "Clusters" (tree clusters reached by the fire) and "Steps" (calls
+            to step() until running is False).
+        """
+        rng = random.Random()
+        rng.setstate(self.random.getstate())
+        result = predict_burn(self.condition_grid(), rng, steps=steps)
+        if steps and not self.running:
+            result["Steps"] = 0
+        return result
+
+    def save_checkpoint(self, path):
+        """Save a compact binary snapshot of the run to ``path`` (.npz).
+
+        Loading it with ``ForestFire.load_checkpoint`` and stepping on gives
+        exactly the same run as never stopping.
+        """
+        if self.stream is not None:
+            raise ValueError("A run streaming its records to disk cannot be checkpointed")
+        write_snapshot(path, self)
+
+    @classmethod
+    def load_checkpoint(cls, path):
+        """Rebuild a model from a snapshot written by ``save_checkpoint``."""
+        snapshot = read_snapshot(path)
+        model = cls(
+            snapshot["width"],
+            snapshot["height"],
+            density=0.0,
+            engine=snapshot["engine"],
+            collect_every=snapshot["collect_every"],
+        )
+        model._place_trees(snapshot["conditions"])
+        model.random.setstate(snapshot["random_state"])
+        model.rng.bit_generator.state = snapshot["rng_state"]
+        model.steps = snapshot["steps"]
+        model.running = snapshot["running"]
+        model._last_record = snapshot["last_record"]
+        model_vars = model.datacollector.model_vars
+        columns = list(zip(*snapshot["history"])) or [()] * len(model_vars)
+        for name, column in zip(model_vars, columns):
+            model_vars[name] = list(column)
+        return model
+
     @staticmethod
     def count_type(model, tree_condition):
-        """Helper method to count trees in a given condition in a given model."""
-        return len(model.agents.select(lambda x: x.condition == tree_condition))
+        """Helper method to count trees in a given condition in a given model.
+
+        Scans the whole forest; use ``model.condition_counts`` for a cheap read.
+        """
+        return int(np.count_nonzero(model.conditions == CONDITION_CODES[tree_condition]))
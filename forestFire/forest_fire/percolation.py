@@ -0,0 +1,134 @@
+from collections import deque
+
+import numpy as np
+
+from .array_engine import BURNED_OUT, FINE, ON_FIRE
+from .schedule import order_key
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def label_clusters(conditions):
+    """Label the Moore-connected clusters of unburned trees in one raster pass.
+
+    Each tree is joined with the already visited neighbors before it (the
+    three cells of the previous column and the cell below it) through a
+    union-find with path halving.
+
+    Returns:
+        Flat array with the root index of every unburned tree's cluster, -1
+        for empty and burned out cells.
+    """
+    width, height = conditions.shape
+    alive = ((conditions == FINE) | (conditions == ON_FIRE)).ravel().tolist()
+    parent = list(range(width * height))
+    for x in range(width):
+        for y in range(height):
+            i = x * height + y
+            if not alive[i]:
+                continue
+            for j in (
+                i - height - 1 if x > 0 and y > 0 else -1,
+                i - height if x > 0 else -1,
+                i - height + 1 if x > 0 and y < height - 1 else -1,
+                i - 1 if y > 0 else -1,
+            ):
+                if j >= 0 and alive[j]:
+                    a, b = _find(parent, i), _find(parent, j)
+                    if a != b:
+                        parent[max(a, b)] = min(a, b)
+    return np.array(
+        [_find(parent, i) if alive[i] else -1 for i in range(width * height)],
+        dtype=np.int64,
+    )
+
+
+def burn_steps(conditions, rng):
+    """Number of steps until the fire goes out, without stepping the model.
+
+    A tree burns out in the tick after its first burning neighbor, or in the
+    same tick when its key comes after that neighbor's key (see
+    ``ForestFire._step_burning``). That makes the burn-out tick a shortest
+    path with 0/1 weights from the burning trees, found here with a 0-1 BFS.
+
+    Args:
+        conditions: int8 grid of cell codes.
+        rng: A ``random.Random`` in the state the model's RNG has before its
+            next step; it is advanced by one salt per simulated tick.
+    """
+    width, height = conditions.shape
+    flat = conditions.ravel()
+    tick = np.zeros(width * height, dtype=np.int64)
+    burning = np.flatnonzero(flat == ON_FIRE)
+    if len(burning) == 0:
+        # The model still needs one step to notice there is no fire.
+        return 1
+    tick[burning] = 1
+    fine = (flat == FINE).tolist()
+    tick = tick.tolist()
+    done = [False] * (width * height)
+    salts = [None, rng.getrandbits(64)]
+    queue = deque(burning.tolist())
+    last = 1
+    while queue:
+        i = queue.popleft()
+        if done[i]:
+            continue
+        done[i] = True
+        t = tick[i]
+        if t > last:
+            last = t
+            salts.append(rng.getrandbits(64))
+        key = order_key(salts[t], i)
+        x, y = divmod(i, height)
+        for dx in (-1, 0, 1):
+            if not 0 <= x + dx < width:
+                continue
+            for dy in (-1, 0, 1):
+                j = i + dx * height + dy
+                if (dx or dy) and 0 <= y + dy < height and fine[j]:
+                    if key < order_key(salts[t], j):
+                        t_j, front = t, True
+                    else:
+                        t_j, front = t + 1, False
+                    if tick[j] == 0 or t_j < tick[j]:
+                        tick[j] = t_j
+                        if front:
+                            queue.appendleft(j)
+                        else:
+                            queue.append(j)
+    return last
+
+
+def predict_burn(conditions, rng, steps=True):
+    """Predict the final state of a forest fire from its current grid.
+
+    Args:
+        conditions: int8 grid of cell codes.
+        rng: ``random.Random`` in the model's current state, used only when
+            ``steps`` is True.
+        steps: Also compute the number of steps until the fire goes out.
+
+    Returns:
+        dict with the final "Fine", "On Fire" and "Burned Out" counts,
+        "Clusters" (number of tree clusters reached by the fire) and, when
+        requested, "Steps".
+    """
+    labels = label_clusters(conditions)
+    flat = conditions.ravel()
+    lit_roots = np.unique(labels[flat == ON_FIRE])
+    burns = np.isin(labels, lit_roots) & (labels >= 0)
+    result = {
+        "Fine": int(np.count_nonzero((flat == FINE) & ~burns)),
+        "On Fire": 0,
+        "Burned Out": int(np.count_nonzero(flat == BURNED_OUT) + np.count_nonzero(burns)),
+        "Clusters": len(lit_roots),
+    }
+    if steps:
+        result["Steps"] = burn_steps(conditions, rng)
+    return result
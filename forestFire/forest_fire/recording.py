@@ -0,0 +1,64 @@
+import csv
+from pathlib import Path
+
+
+class RowStream:
+    """Append-only table on disk, written in batches of rows.
+
+    The format comes from the file suffix: ``.csv``, or ``.parquet`` (needs
+    pyarrow). Rows are buffered up to ``batch_size`` and then written out, so
+    memory stays flat however long the run is.
+    """
+
+    def __init__(self, path, columns, batch_size=1000):
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.closed = False
+        self._rows = []
+        if self.path.suffix == ".csv":
+            self._file = open(self.path, "w", newline="")
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(self.columns)
+            self._parquet = None
+        elif self.path.suffix == ".parquet":
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                raise ImportError("Streaming to Parquet needs pyarrow installed") from e
+            self._schema = pa.schema([(name, pa.int64()) for name in self.columns])
+            self._parquet = pq.ParquetWriter(self.path, self._schema)
+            self._file = None
+        else:
+            raise ValueError(f"Unsupported stream format {self.path.suffix!r}, use .csv or .parquet")
+
+    def write(self, row):
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        if self._parquet is not None:
+            import pyarrow as pa
+
+            columns = list(zip(*self._rows))
+            self._parquet.write_table(
+                pa.Table.from_arrays([pa.array(c, pa.int64()) for c in columns], schema=self._schema)
+            )
+        else:
+            self._csv.writerows(self._rows)
+            self._file.flush()
+        self._rows = []
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        self.closed = True
+        if self._parquet is not None:
+            self._parquet.close()
+        else:
+            self._file.close()
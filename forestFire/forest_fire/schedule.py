@@ -0,0 +1,18 @@
+MASK64 = (1 << 64) - 1
+
+
+def order_key(salt, index):
+    """Position of a tree in the step order of one tick.
+
+    Trees step in increasing key order. The key is a splitmix64 hash of the
+    tree's cell index (``x * height + y``) mixed with the tick's random salt,
+    so it is a random permutation of the forest that can be evaluated for a
+    single tree without shuffling all of them. The hash is a bijection, so
+    two trees never share a key.
+
+    Works on a Python int or on a NumPy uint64 array of indices.
+    """
+    z = (salt + (index + 1) * 0x9E3779B97F4A7C15) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
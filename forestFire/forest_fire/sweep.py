@@ -0,0 +1,173 @@
+"""Headless density sweep for ForestFire.
+
+Run from the forestFire directory, for example:
+
+    python -m forest_fire.sweep --replicates 20 --out sweep.csv
+
+Every (density, replicate) job runs in a process pool. Finished jobs are
+appended to the output CSV as they complete, and running the same command
+again skips the jobs already in that file. The grid size, base seed and
+engine are stored with every row, so a rerun with other settings runs its
+own jobs instead of reusing rows that do not match.
+"""
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from .array_engine import BURNED_OUT, FINE
+from .model import ForestFire
+
+# The run settings that, with (density, replicate), identify a job.
+SETTINGS = ["width", "height", "base_seed", "engine"]
+COLUMNS = [*SETTINGS, "density", "replicate", "seed", "trees", "burned_fraction", "steps", "wall_time"]
+
+
+def job_seed(base_seed, density, replicate):
+    """Seed of one job, fixed by its parameters and not by when it runs."""
+    entropy = [base_seed, int(round(density * 1_000_000)), replicate]
+    return int(np.random.SeedSequence(entropy).generate_state(1)[0])
+
+
+def run_job(width, height, density, replicate, seed, engine="array"):
+    """Run one forest until the fire is out and return its result row."""
+    start = time.perf_counter()
+    model = ForestFire(width, height, density, seed=seed, engine=engine, collect_every="final")
+    while model.running:
+        model.step()
+    trees = model.condition_counts[FINE] + model.condition_counts[BURNED_OUT]
+    return {
+        "width": width,
+        "height": height,
+        "engine": engine,
+        "density": density,
+        "replicate": replicate,
+        "seed": seed,
+        "trees": trees,
+        "burned_fraction": model.condition_counts[BURNED_OUT] / trees if trees else 0.0,
+        "steps": model.steps,
+        "wall_time": time.perf_counter() - start,
+    }
+
+
+def run_sweep(
+    densities,
+    replicates,
+    width=100,
+    height=100,
+    base_seed=0,
+    engine="array",
+    processes=None,
+    out=None,
+):
+    """Run every (density, replicate) pair and return one row per run.
+
+    Args:
+        densities: Tree densities to sweep.
+        replicates: Number of seeds per density.
+        width, height: The size of every grid
+        base_seed: Seed the per-job seeds are derived from.
+        engine: ForestFire engine used by the runs.
+        processes: Worker processes, all cores by default.
+        out: Optional CSV path. Finished jobs are appended to it as they
+            complete, and jobs already in it with the same settings are not
+            run again.
+
+    Returns:
+        DataFrame with the columns in ``COLUMNS``, sorted by density and
+        replicate, holding only the runs with these settings.
+
+    Raises:
+        ValueError: If ``out`` exists but was not written with the columns
+            in ``COLUMNS``, so its rows cannot be matched to their settings.
+    """
+    densities = [round(float(d), 6) for d in densities]
+    done = pd.DataFrame(columns=COLUMNS)
+    if out is not None and os.path.exists(out):
+        done = pd.read_csv(out, float_precision="round_trip")
+        if list(done.columns) != COLUMNS:
+            raise ValueError(
+                f"{out} does not have the sweep columns {COLUMNS}; "
+                "its rows cannot be matched to their settings, use another output file"
+            )
+    settings = {"width": width, "height": height, "base_seed": base_seed, "engine": engine}
+    same_settings = pd.Series(True, index=done.index)
+    for name, value in settings.items():
+        same_settings &= done[name] == value
+    done = done[same_settings]
+    finished = set(zip(done["density"].round(6), done["replicate"]))
+    jobs = [
+        (density, replicate)
+        for density in densities
+        for replicate in range(replicates)
+        if (density, replicate) not in finished
+    ]
+
+    rows = []
+    writer = None
+    if out is not None:
+        new_file = not os.path.exists(out)
+        out_file = open(out, "a", newline="")
+        writer = csv.DictWriter(out_file, fieldnames=COLUMNS)
+        if new_file:
+            writer.writeheader()
+    try:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [
+                pool.submit(
+                    run_job, width, height, density, replicate,
+                    job_seed(base_seed, density, replicate), engine,
+                )
+                for density, replicate in jobs
+            ]
+            for future in as_completed(futures):
+                row = {**future.result(), "base_seed": base_seed}
+                rows.append(row)
+                if writer is not None:
+                    writer.writerow(row)
+                    out_file.flush()
+    finally:
+        if writer is not None:
+            out_file.close()
+
+    results = pd.concat([done, pd.DataFrame(rows, columns=COLUMNS)], ignore_index=True)
+    results = results[results["density"].round(6).isin(densities)]
+    return results.sort_values(["density", "replicate"]).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ForestFire density sweep")
+    parser.add_argument("--width", type=int, default=100)
+    parser.add_argument("--height", type=int, default=100)
+    parser.add_argument("--min-density", type=float, default=0.01)
+    parser.add_argument("--max-density", type=float, default=1.0)
+    parser.add_argument("--density-step", type=float, default=0.01)
+    parser.add_argument("--replicates", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", choices=["array", "agents"], default="array")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--out", default="sweep.csv")
+    args = parser.parse_args()
+
+    count = int(round((args.max_density - args.min_density) / args.density_step)) + 1
+    densities = args.min_density + args.density_step * np.arange(count)
+    results = run_sweep(
+        densities,
+        args.replicates,
+        width=args.width,
+        height=args.height,
+        base_seed=args.seed,
+        engine=args.engine,
+        processes=args.processes,
+        out=args.out,
+    )
+    summary = results.groupby("density")[["burned_fraction", "steps"]].mean()
+    print(summary.to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,62 @@
+import numpy as np
+import solara
+
+from forest_fire.array_engine import CONDITION_CODES
 from forest_fire.model import ForestFire
 
 from mesa.visualization import (
     SolaraViz,
     make_plot_component,
-    make_space_component,
 )
 
 from mesa.visualization.user_param import (
     Slider,
 )
 
-from mesa.visualization.components import AgentPortrayalStyle
+from mesa.visualization.utils import update_counter
 
 COLORS = {"Fine": "#00AA00", "On Fire": "#880000", "Burned Out": "#000000"}
 
-# Since it is a matplotlib visualization, you can use the markers in https://matplotlib.org/stable/api/markers_api.html
-def forest_fire_portrayal(tree):
-    if tree is None:
-        return
+# RGB color of each cell code, empty cells are left white.
+PALETTE = np.full((max(CONDITION_CODES.values()) + 1, 3), 255, dtype=np.uint8)
+for condition, code in CONDITION_CODES.items():
+    PALETTE[code] = [int(COLORS[condition][i:i + 2], 16) for i in (1, 3, 5)]
+
+class RasterFrame:
+    """RGB image of the forest, one pixel per cell, kept between frames.
+
+    Only the pixels of the cells whose condition changed since the last frame
+    are repainted.
+    """
 
-    return AgentPortrayalStyle(
-            color= COLORS[tree.condition],
-            marker="+",
-    )
+    def __init__(self):
+        self.model = None
+        self.codes = None
+        self.pixels = None
 
-def post_process_space(ax):
-    ax.set_aspect("equal")
-    ax.set_xticks([])
-    ax.set_yticks([])
+    def update(self, model):
+        codes = model.condition_grid()
+        if model is not self.model:
+            self.model = model
+            self.pixels = PALETTE[codes]
+        else:
+            changed = np.nonzero(codes != self.codes)
+            self.pixels[changed] = PALETTE[codes[changed]]
+        self.codes = codes
+        # Image rows go from the top of the grid down, with x to the right.
+        return np.ascontiguousarray(self.pixels.transpose(1, 0, 2)[::-1])
+
+@solara.component
+def RasterSpace(model):
+    update_counter.get()
+    frame = solara.use_memo(RasterFrame, [])
+    solara.Style(".forest-raster img, img.forest-raster { image-rendering: pixelated; }")
+    solara.Image(frame.update(model), width="100%", classes=["forest-raster"])
 
 def post_process_lines(ax):
     ax.legend(loc="center left", bbox_to_anchor=(1, 0.9))
 
-space_component = make_space_component(
-    forest_fire_portrayal,
-    draw_grid=False,
-    post_process=post_process_space,
-)
+space_component = RasterSpace
 
 lineplot_component = make_plot_component(
     COLORS,
@@ -0,0 +1,17 @@
+import pytest
+
+from forest_fire.array_engine import CONDITION_CODES
+from forest_fire.model import ForestFire
+
+
+@pytest.mark.parametrize("engine", ["agents", "array"])
+@pytest.mark.parametrize("density", [0.3, 0.65, 0.9])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_condition_counts_match_full_recount(engine, density, seed):
+    model = ForestFire(width=20, height=20, density=density, seed=seed, engine=engine)
+    while True:
+        for label, code in CONDITION_CODES.items():
+            assert model.condition_counts[code] == ForestFire.count_type(model, label)
+        if not model.running:
+            break
+        model.step()
@@ -1,5 +1,9 @@
 from mesa.discrete_space import CellAgent, FixedAgent
 from collections import deque
+from heapq import heapify, heappop, heappush
+
+# Distancia de las celdas sin estación alcanzable en el campo de distancias
+UNREACHABLE = float("inf")
 
 class TrashAgent(FixedAgent):
     def __init__ (self, model, cell):
@@ -31,12 +35,20 @@ class RandomAgent(CellAgent):
 
         # Estados de comportamiento
         self.returnning_to_station = False
+        # Ruta A* guardada hacia una estación pedida, al reves (el siguiente paso va al
+        # final), y el conjunto de sus celdas para saber si un obstaculo nuevo la corta
         self.path_to_station = None
+        self.station_route_cells = set()
         self.state_charging = False
 
         #Estado para exploracion proactiva
         self.exploration_target = None
         self.path_to_target = None
+        # Generacion del ultimo BFS que no encontro frontera alcanzable. Mientras la
+        # celda actual siga marcada con ella, el robot sigue en la misma region
+        # cerrada y no vale la pena repetir la busqueda; se olvida cuando el mapa
+        # gana una frontera o pierde un obstaculo
+        self.failed_frontier_search = None
 
         self.trash_count = trash_count
         self.movement_count = 0
@@ -47,15 +59,19 @@ class RandomAgent(CellAgent):
         # Marcamos la celda inicial como visitada (2)
         self.mapa[self.cell.coordinate] = 2
 
+        # Campo de distancias (en pasos, sobre mi mapa) a la estacion conocida mas
+        # cercana, indexado por x * height + y. Se actualiza al descubrir estaciones
+        # u obstaculos, asi ir a cargar no necesita buscar rutas.
+        self.station_distance = [UNREACHABLE] * (self.model.width * self.model.height)
+        for station in self.known_stations:
+            self.open_station_distance(station, source=True)
+
     @property
     def neighbors(self):
         return self.cell.neighborhood.agents
     
     def get_cell_from_coords(self, x, y):
-        for cell in self.model.grid.all_cells:
-            if cell.coordinate == (x,y):
-                return cell
-        return None
+        return self.model.cell_at(x, y)
 
     def scan_environment(self):
         """Actualiza el mapa con la información local"""
@@ -71,15 +87,24 @@ class RandomAgent(CellAgent):
             # Si no la conozco, la marco como frontera (-1) inicialmente
             if (nx, ny) not in self.mapa: 
                 self.mapa[(nx, ny)] = -1 
+                self.failed_frontier_search = None
 
             # Detectar contenido
             has_obstacle = False
             for agent in neigh_cell.agents:
                 if isinstance(agent, ChargingStationAgent):
-                    self.known_stations.add(neigh_cell.coordinate)
+                    if neigh_cell.coordinate not in self.known_stations:
+                        self.known_stations.add(neigh_cell.coordinate)
+                        self.open_station_distance(neigh_cell.coordinate, source=True)
                     self.mapa[(nx, ny)] = 0 # Estaciones son transitables
                 elif isinstance(agent, ObstacleAgent):
-                    self.mapa[(nx, ny)] = 1
+                    if self.mapa[(nx, ny)] != 1:
+                        self.mapa[(nx, ny)] = 1
+                        self.block_station_distance((nx, ny))
+                        # Un obstaculo sobre la ruta guardada obliga a recalcularla
+                        if (nx, ny) in self.station_route_cells:
+                            self.path_to_station = None
+                            self.station_route_cells = set()
                     has_obstacle = True
             
             # Si ya sabía que era -1 y veo que no hay obstaculo, confirmo que es accesible
@@ -87,6 +112,8 @@ class RandomAgent(CellAgent):
             if not has_obstacle and self.mapa[(nx, ny)] == 1:
                  # Correccion de mapa: creiamos que era obstáculo pero no lo es (casos dinámicos)
                  self.mapa[(nx, ny)] = 0
+                 self.open_station_distance((nx, ny))
+                 self.failed_frontier_search = None
 
     def move(self):
         if self.energy <= 0:
@@ -167,7 +194,8 @@ class RandomAgent(CellAgent):
 
     def proactive_exploration(self):
         """
-        Calcula una ruta hacia la celda inexplorada (-1) más cercana en el mapa conocido.
+        Calcula una ruta hacia la celda inexplorada (-1) más cercana por camino en el
+        mapa conocido, con un solo BFS que para en la primera frontera alcanzable.
         """
         current_pos = self.cell.coordinate
         
@@ -185,29 +213,15 @@ class RandomAgent(CellAgent):
                 # Ruta bloqueada, recalcular
                 self.path_to_target = None
 
-        # Buscar todas las celdas marcadas como -1 en mi mapa
-        frontier_cells = [pos for pos, val in self.mapa.items() if val == -1]
-        
-        if not frontier_cells:
-            # Mapa completamente explorado (o inaccesible): Movimiento Aleatorio
-            # pero evitando obstáculos
-            valid_neighbors = self.cell.neighborhood.select(
-                 lambda cell: not any(isinstance(a, ObstacleAgent) for a in cell.agents)
-            )
-            if valid_neighbors:
-                self.execute_move(valid_neighbors.select_random_cell())
-            return
-
-        # Encontrar la mas cercana (Distancia Manhattan simple)
-        # Esto es una heuristica rapida antes de hacer el BFS pesado
-        closest_frontier = min(
-            frontier_cells, 
-            key=lambda pos: abs(pos[0] - current_pos[0]) + abs(pos[1] - current_pos[1])
-        )
+        # Calcular ruta BFS hacia la frontera alcanzable mas cercana
+        current_index = current_pos[0] * self.model.height + current_pos[1]
+        if (self.failed_frontier_search is not None
+                and self.model.search_stamp[current_index] == self.failed_frontier_search):
+            path = None
+        else:
+            path = self.bfs(current_pos)
+            self.failed_frontier_search = None if path is not None else self.model.search_generation
 
-        # Calcular ruta BFS hacia esa frontera
-        path = self.bfs(current_pos, closest_frontier)
-        
         if path and len(path) > 1:
             self.path_to_target = path[1:] # Quitamos la posicion actual
             next_pos = self.path_to_target[0]
@@ -216,47 +230,181 @@ class RandomAgent(CellAgent):
                 self.execute_move(next_cell)
                 self.path_to_target.pop(0)
         else:
-            # Si no encuentra ruta (ej. isla inalcanzable), marcar esa celda como visitada 
-            # para no volver a intentarlo y moverse random
-            self.mapa[closest_frontier] = 2 
+            # Mapa completamente explorado (o el resto es inaccesible): Movimiento
+            # Aleatorio pero evitando obstáculos
             valid_neighbors = self.cell.neighborhood.select(
                  lambda cell: not any(isinstance(a, ObstacleAgent) for a in cell.agents)
             )
             if valid_neighbors:
                 self.execute_move(valid_neighbors.select_random_cell())
 
-    def go_to_station(self):
+    def go_to_station(self, station=None):
+        """
+        Da un paso hacia una estación de carga y empieza a cargar al llegar.
+
+        Sin station va a la estación conocida más cercana bajando por el campo de
+        distancias, sin buscar rutas. Con station va a esa estación por una ruta
+        A* que se guarda entre pasos y solo se recalcula si se corta.
+        """
         current_pos = self.cell.coordinate
-        # 1. Seleccionar estación mas cercana
-        closest_station = min(
-            self.known_stations, 
-            key=lambda pos: abs(pos[0] - current_pos[0]) + abs(pos[1] - current_pos[1])
-        )
-        # 2. Si ya estoy en la estación: CARGAR
-        if current_pos == closest_station:
+        if station is None:
+            next_pos = self.station_field_step(current_pos)
+        else:
+            next_pos = self.station_route_step(current_pos, station)
+        # 1. Si ya estoy en la estación: CARGAR
+        if next_pos == current_pos:
             self.state_charging = True
             return
-        # 3. Calcular ruta
-        path = self.bfs(current_pos, closest_station)
-        
-        if path and len(path) > 1:
-            next_pos = path[1]
-            next_cell = self.get_cell_from_coords(*next_pos)
-              
-            # Verificar si hay otro robot en la siguiente celda (sea la estacion o el camino)
-            has_robot = any(isinstance(agent, RandomAgent) for agent in next_cell.agents)
-            
-            # Solo nos movemos si la celda existe Y NO hay otro robot
-            if next_cell and not has_robot:
-                self.execute_move(next_cell)
-                
-                # Si al moverme cai en la estacion, activar estado de carga
-                if next_pos in self.known_stations:
-                    self.state_charging = True
-            else:
-                # Si esta ocupada, el agente "espera" este turno (pass)
-                # Esto hace una fila de espera natural
-                pass
+        # 2. Sin estacion alcanzable en mi mapa: esperar
+        if next_pos is None:
+            return
+        next_cell = self.get_cell_from_coords(*next_pos)
+
+        # Verificar si hay otro robot en la siguiente celda (sea la estacion o el camino)
+        has_robot = any(isinstance(agent, RandomAgent) for agent in next_cell.agents)
+
+        # Solo nos movemos si la celda existe Y NO hay otro robot
+        if next_cell and not has_robot:
+            self.execute_move(next_cell)
+            if station is not None:
+                self.path_to_station.pop()
+                self.station_route_cells.discard(next_pos)
+
+            # Si al moverme cai en la estacion, activar estado de carga
+            if next_pos == station or (station is None and next_pos in self.known_stations):
+                self.state_charging = True
+        else:
+            # Si esta ocupada, el agente "espera" este turno (pass)
+            # Esto hace una fila de espera natural
+            pass
+
+    def station_field_step(self, current_pos):
+        """
+        Siguiente paso hacia la estación más cercana segun el campo de distancias:
+        current_pos si ya estoy en una, None si no hay ninguna alcanzable.
+        """
+        distance = self.station_distance
+        here = distance[current_pos[0] * self.model.height + current_pos[1]]
+        if here == 0:
+            return current_pos
+        if here == UNREACHABLE:
+            return None
+        # El primer vecino un paso mas cerca (mismo orden de direcciones que bfs)
+        for next_index, next_pos in self.grid_neighbors(current_pos):
+            if distance[next_index] == here - 1:
+                return next_pos
+
+    def station_route_step(self, current_pos, station):
+        """
+        Siguiente paso de la ruta guardada hacia station: current_pos si ya estoy
+        ahi, None si no hay ruta. La ruta solo se recalcula (con A*) si no hay, si
+        lleva a otra estacion, si no sale de donde estoy o si el siguiente paso
+        quedo bloqueado en el mapa.
+        """
+        if current_pos == station:
+            self.path_to_station = None
+            self.station_route_cells = set()
+            return current_pos
+        route = self.path_to_station
+        if (not route
+                or route[0] != station
+                or abs(route[-1][0] - current_pos[0]) + abs(route[-1][1] - current_pos[1]) != 1
+                or self.mapa.get(route[-1]) == 1):
+            path = self.astar(current_pos, station)
+            if not path:
+                self.path_to_station = None
+                self.station_route_cells = set()
+                return None
+            route = self.path_to_station = path[:0:-1] # Quitamos la posicion actual
+            self.station_route_cells = set(route)
+        return route[-1]
+
+    def grid_neighbors(self, pos):
+        """Vecinos ortogonales dentro del grid como (indice, coordenada), en el orden de bfs"""
+        x, y = pos
+        width, height = self.model.width, self.model.height
+        index = x * height + y
+        neighbors = []
+        if y + 1 < height:
+            neighbors.append((index + 1, (x, y + 1)))
+        if y > 0:
+            neighbors.append((index - 1, (x, y - 1)))
+        if x > 0:
+            neighbors.append((index - height, (x - 1, y)))
+        if x + 1 < width:
+            neighbors.append((index + height, (x + 1, y)))
+        return neighbors
+
+    def relax_station_distance(self, heap):
+        """
+        Propaga hacia afuera las distancias que bajaron. `heap` trae
+        (distancia, indice, coordenada) de las celdas que ya se actualizaron.
+        """
+        distance = self.station_distance
+        while heap:
+            d, index, pos = heappop(heap)
+            if d > distance[index]:
+                continue  # Entrada vieja, la celda ya bajo mas
+            d += 1
+            for next_index, next_pos in self.grid_neighbors(pos):
+                if distance[next_index] > d and self.mapa.get(next_pos, -1) != 1:
+                    distance[next_index] = d
+                    heappush(heap, (d, next_index, next_pos))
+
+    def open_station_distance(self, pos, source=False):
+        """Actualiza el campo cuando pos pasa a ser estación (source) o deja de ser obstáculo"""
+        distance = self.station_distance
+        index = pos[0] * self.model.height + pos[1]
+        if source:
+            d = 0
+        else:
+            d = min((distance[n] for n, _ in self.grid_neighbors(pos)), default=UNREACHABLE) + 1
+        if d < distance[index]:
+            distance[index] = d
+            self.relax_station_distance([(d, index, pos)])
+
+    def block_station_distance(self, pos):
+        """
+        Actualiza el campo cuando pos pasa a ser obstáculo. Solo se invalidan las
+        celdas cuya distancia dependia de pos (las que se quedan sin ningun vecino
+        un paso mas cerca) y luego se reparan desde los vecinos que siguen bien.
+
+        Una estación conocida sigue siendo fuente aunque comparta celda con un
+        obstáculo, asi que su celda nunca se invalida.
+        """
+        if pos in self.known_stations:
+            return
+        distance = self.station_distance
+        index = pos[0] * self.model.height + pos[1]
+        old = distance[index]
+        distance[index] = UNREACHABLE
+        if old == UNREACHABLE:
+            return
+
+        # 1. Invalidar por capas de distancia creciente, asi al revisar una celda
+        # ya se invalido todo lo que estaba un paso mas cerca que ella
+        heap = [(old, index, pos)]
+        invalid = []
+        while heap:
+            d, current, current_pos = heappop(heap)
+            for next_index, next_pos in self.grid_neighbors(current_pos):
+                if distance[next_index] != d + 1:
+                    continue
+                if any(distance[n] == d for n, _ in self.grid_neighbors(next_pos)):
+                    continue  # Sigue teniendo otro vecino que la sostiene
+                distance[next_index] = UNREACHABLE
+                invalid.append((next_index, next_pos))
+                heappush(heap, (d + 1, next_index, next_pos))
+
+        # 2. Reparar desde los vecinos validos y propagar
+        repair = []
+        for current, current_pos in invalid:
+            d = min(distance[n] for n, _ in self.grid_neighbors(current_pos)) + 1
+            if d < distance[current]:
+                distance[current] = d
+                repair.append((d, current, current_pos))
+        heapify(repair)
+        self.relax_station_distance(repair)
 
     def execute_move(self, next_cell):
         """Función auxiliar para ejecutar el movimiento físico y gasto de energía"""
@@ -272,45 +420,147 @@ class RandomAgent(CellAgent):
         self.move()
         
 
-    def bfs(self, start, goal):
+    def bfs(self, start, goal=None):
         """
         BFS que considera transitables:
         0: Libre escaneado
         2: Visitado (para poder regresar)
         -1: Frontera (destino válido)
         Estaciones: Transitables
+
+        Sin goal, la meta es la primera frontera (-1, o fuera de mi mapa) que
+        alcance, es decir la más cercana por camino.
+
+        Cada celda guarda solo de donde se llego a ella (en los buffers del
+        modelo) y la ruta se arma al final, al encontrar la meta.
         """
-        queue = deque([(start, [start])])
-        visited = {start}
-        directions = [(0,1), (0,-1), (-1,0), (1,0)]
+        if start == goal:
+            return [start]
 
-        while queue:
-            current_pos, path = queue.popleft()
+        width, height = self.model.width, self.model.height
+        # Verificar límites de la meta (fuera del grid nunca se alcanza)
+        if goal is not None and not (0 <= goal[0] < width and 0 <= goal[1] < height):
+            return None
 
-            if current_pos == goal:
-                return path
+        # Buffers del modelo, indexados por x * height + y
+        stamp = self.model.search_stamp
+        parent = self.model.search_parent
+        self.model.search_generation += 1
+        generation = self.model.search_generation
 
-            x,y = current_pos
-            for dx, dy in directions:
-                next_pos = (x+dx, y+dy)
-                
-                if next_pos in visited:
-                    continue
-                
+        start_index = start[0] * height + start[1]
+        goal_index = -1 if goal is None else goal[0] * height + goal[1]
+        stamp[start_index] = generation
+        queue = deque([start_index])
+
+        while queue:
+            current = queue.popleft()
+            x, y = divmod(current, height)
+            # Mismo orden de direcciones de siempre: (0,1), (0,-1), (-1,0), (1,0)
+            for next_index, nx, ny in (
+                (current + 1, x, y + 1),
+                (current - 1, x, y - 1),
+                (current - height, x - 1, y),
+                (current + height, x + 1, y),
+            ):
                 # Verificar límites
-                if not (0 <= next_pos[0] < self.model.width and 0 <= next_pos[1] < self.model.height):
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+
+                if stamp[next_index] == generation:
                     continue
 
                 # Lógica de Mapa para BFS
                 # Default -1 si no está en el mapa (asumimos explorable)
-                cell_state = self.mapa.get(next_pos, -1) 
-
                 # REGLA: Solo caminamos por celdas Libres (0), Visitadas (2), o la meta (-1)
                 # Obstáculos (1) están prohibidos.
-                if cell_state == 1:
+                value = self.mapa.get((nx, ny), -1)
+                if value == 1:
                     continue
-                
-                visited.add(next_pos)
-                queue.append((next_pos, path + [next_pos]))
-        
-        return None
\ No newline at end of file
+
+                stamp[next_index] = generation
+                parent[next_index] = current
+                if next_index == goal_index or (goal is None and value == -1):
+                    # Reconstruir la ruta siguiendo los padres hasta el inicio
+                    path = [(nx, ny)]
+                    while current != start_index:
+                        path.append(divmod(current, height))
+                        current = parent[current]
+                    path.append(start)
+                    path.reverse()
+                    return path
+                queue.append(next_index)
+
+        return None
+
+    def astar(self, start, goal):
+        """
+        A* con heuristica Manhattan. Camina por las mismas celdas que bfs y
+        devuelve una ruta igual de corta (start y goal incluidos) o None, pero
+        solo expande las celdas que van en direccion a la meta.
+        """
+        if start == goal:
+            return [start]
+
+        width, height = self.model.width, self.model.height
+        # Verificar límites de la meta (fuera del grid nunca se alcanza)
+        if not (0 <= goal[0] < width and 0 <= goal[1] < height):
+            return None
+
+        # Buffers del modelo, indexados por x * height + y
+        stamp = self.model.search_stamp
+        parent = self.model.search_parent
+        cost = self.model.search_cost
+        self.model.search_generation += 1
+        generation = self.model.search_generation
+
+        gx, gy = goal
+        start_index = start[0] * height + start[1]
+        goal_index = gx * height + gy
+        stamp[start_index] = generation
+        cost[start_index] = 0
+        # Entradas (costo estimado, -costo recorrido, celda): a igual estimado se
+        # expande primero la celda mas avanzada
+        heap = [(abs(start[0] - gx) + abs(start[1] - gy), 0, start_index)]
+
+        while heap:
+            _, g, current = heappop(heap)
+            g = -g
+            if g > cost[current]:
+                continue  # Entrada vieja, la celda ya salio con menor costo
+
+            if current == goal_index:
+                # Reconstruir la ruta siguiendo los padres hasta el inicio
+                path = []
+                while current != start_index:
+                    path.append(divmod(current, height))
+                    current = parent[current]
+                path.append(start)
+                path.reverse()
+                return path
+
+            x, y = divmod(current, height)
+            g += 1
+            for next_index, nx, ny in (
+                (current + 1, x, y + 1),
+                (current - 1, x, y - 1),
+                (current - height, x - 1, y),
+                (current + height, x + 1, y),
+            ):
+                # Verificar límites
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+
+                if stamp[next_index] == generation and cost[next_index] <= g:
+                    continue
+
+                # Obstáculos (1) están prohibidos, igual que en bfs
+                if self.mapa.get((nx, ny), -1) == 1:
+                    continue
+
+                stamp[next_index] = generation
+                cost[next_index] = g
+                parent[next_index] = current
+                heappush(heap, (g + abs(nx - gx) + abs(ny - gy), -g, next_index))
+
+        return None